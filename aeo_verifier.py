@@ -1,29 +1,45 @@
-import re
-from bs4 import BeautifulSoup
+import readability_stats
+from check_registry import CheckRegistry
+from html_document import DocumentIndex
+from signal_matcher import SignalPatterns
+
+AEO_CHECKS = CheckRegistry()
+
+# E-E-A-T signals: author mentions count in the page text or in link targets,
+# the rest only in link targets.
+TRUST_TEXT_PATTERNS = SignalPatterns().add('trust', 'Author Info', literals=('author',), ignore_case=True)
+TRUST_LINK_PATTERNS = (
+    SignalPatterns()
+    .add('trust', 'Author Info', literals=('author',), ignore_case=True)
+    .add('trust', 'About Page', literals=('about',), ignore_case=True)
+    .add('trust', 'Privacy/Terms', literals=('privacy', 'terms'), ignore_case=True)
+)
 
 class AeoVerifier:
-    def __init__(self, html_content):
-        self.soup = BeautifulSoup(html_content, 'html.parser')
+    def __init__(self, html_content=None, parser_backend=None, document=None):
+        # Reuse a DocumentIndex already built for SeoVerifier when one is given
+        self.document = document if document is not None else DocumentIndex.from_html(
+            html_content or '', backend=parser_backend)
         self.results = {}
 
-    def analyze(self):
-        """Run all AEO analysis methods."""
-        self.results['answer_first'] = self.check_answer_first()
-        self.results['content_structure'] = self.check_content_structure()
-        self.results['structured_data_deep_dive'] = self.check_structured_data_deep_dive()
-        self.results['readability_signal'] = self.check_readability_signal()
-        self.results['e_e_a_t_signals'] = self.check_eeat_signals()
+    def analyze(self, checks=None, skip=None):
+        """Run the registered AEO checks (all, or a subset by name)."""
+        results, check_meta = AEO_CHECKS.run_sync(self, only=checks, skip=skip)
+        self.results = results
+        check_meta['parse_ms'] = self.document.parse_ms
+        check_meta['truncated'] = self.document.truncated
+        self.results['check_meta'] = check_meta
         return self.results
 
+    @AEO_CHECKS.register('answer_first', inputs=('first_paragraph',))
     def check_answer_first(self):
         """Check if the main keyword or question is answered in the first 100 words."""
         # Simple heuristic: Check if the first paragraph is concise (under 50 words) 
         # which often indicates a direct answer or summary.
-        first_p = self.soup.find('p')
-        if not first_p:
+        text = self.document.first_paragraph
+        if text is None:
              return {"status": "⚠️ Warning", "details": "No paragraph found at start."}
         
-        text = first_p.get_text(strip=True)
         word_count = len(text.split())
         
         status = "✅ Pass" if 10 <= word_count <= 60 else "⚠️ Warning"
@@ -33,10 +49,11 @@ class AeoVerifier:
             "details": "First paragraph is concise (potential direct answer)." if status == "✅ Pass" else "First paragraph might be too long or too short for a direct answer."
         }
 
+    @AEO_CHECKS.register('content_structure', inputs=('tag_counts',))
     def check_content_structure(self):
         """Check for lists and tables which AI loves."""
-        tables = len(self.soup.find_all('table'))
-        lists = len(self.soup.find_all(['ul', 'ol']))
+        tables = self.document.count('table')
+        lists = self.document.count('ul', 'ol')
         
         details = []
         if tables > 0: details.append(f"{tables} Tables found")
@@ -48,31 +65,14 @@ class AeoVerifier:
             "details": ", ".join(details) if details else "No tables or lists found (AI prefers structured data)."
         }
 
+    @AEO_CHECKS.register('structured_data_deep_dive', inputs=('json_ld',))
     def check_structured_data_deep_dive(self):
         """Check for specific schemas that trigger Rich Results/AI Citation."""
-        import json
-        scripts = self.soup.find_all('script', type='application/ld+json')
-        found_types = []
+        # Every @type, nested ones included, from the page's shared JSON-LD index
+        found_types = self.document.structured_data.types
         
         critical_aeo_schemas = ['FAQPage', 'HowTo', 'Article', 'NewsArticle', 'Product']
         
-        for script in scripts:
-            try:
-                data = json.loads(script.string if script.string else '{}')
-                # Recursive function to find types in nested JSON-LD
-                def find_type(obj):
-                    if isinstance(obj, dict):
-                        if '@type' in obj:
-                            t = obj['@type']
-                            if isinstance(t, list): found_types.extend(t)
-                            else: found_types.append(t)
-                        for v in obj.values(): find_type(v)
-                    elif isinstance(obj, list):
-                        for i in obj: find_type(i)
-                
-                find_type(data)
-            except: pass
-            
         found_critical = [t for t in found_types if t in critical_aeo_schemas]
         
         status = "✅ Pass" if found_critical else "⚠️ Warning"
@@ -82,40 +82,47 @@ class AeoVerifier:
             "details": f"Found AI-Preferred Schemas: {', '.join(found_critical)}" if found_critical else "No high-value AEO schemas (FAQ, HowTo, Article) found."
         }
 
+    @AEO_CHECKS.register('readability_signal', inputs=('text', 'headings'))
     def check_readability_signal(self):
-        """Estimate readability (simple heuristic for now)."""
+        """Sentence-length distribution over the whole page and per section."""
         # AI prefers simple, clear sentences.
-        text = self.soup.get_text(separator=' ', strip=True)[:5000]
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s for s in sentences if len(s.strip()) > 0]
-        
-        if not sentences:
+        stats = readability_stats.analyze_document(self.document)
+        page = stats['page']
+
+        if not page['sentences']:
              return {"status": "❓ Unknown", "details": "No text content found."}
-             
-        avg_words = sum(len(s.split()) for s in sentences) / len(sentences)
-        
+
+        avg_words = page['mean']
+        long_share = round(page['long_sentence_share'] * 100, 1)
+
         # Lower average sentence length is generally better for readability/AI
         status = "✅ Pass" if avg_words < 20 else "⚠️ Warning"
         return {
             "status": status,
-            "avg_sentence_length": round(avg_words, 1),
-            "details": f"Avg Sentence Length: {round(avg_words, 1)} words (AI prefers < 20)."
+            "avg_sentence_length": avg_words,
+            "median_sentence_length": page['median'],
+            "p90_sentence_length": page['p90'],
+            "long_sentence_share": page['long_sentence_share'],
+            "sentence_count": page['sentences'],
+            "word_count": page['words'],
+            "syllables_per_word": page.get('syllables_per_word'),
+            "sections": stats['sections'],
+            "section_count": stats['section_count'],
+            "details": (
+                f"Avg Sentence Length: {avg_words} words, p90 {page['p90']}, "
+                f"{long_share}% over {readability_stats.LONG_SENTENCE_WORDS} words (AI prefers < 20)."
+            )
         }
 
+    @AEO_CHECKS.register('e_e_a_t_signals', inputs=('text', 'anchors'))
     def check_eeat_signals(self):
         """Check for E-E-A-T signals like Author, About page links."""
-        text_content = self.soup.get_text().lower()
-        links = [a.get('href', '').lower() for a in self.soup.find_all('a')]
-        
-        has_author = 'author' in text_content or any('author' in l for l in links)
-        has_about = any('about' in l for l in links)
-        has_privacy = any('privacy' in l for l in links) or any('terms' in l for l in links)
-        
-        signals = []
-        if has_author: signals.append("Author Info")
-        if has_about: signals.append("About Page")
-        if has_privacy: signals.append("Privacy/Terms")
-        
+        hrefs = '\n'.join(a.get('href') or '' for a in self.document.anchors)
+        found = set(TRUST_LINK_PATTERNS.match(hrefs)['trust'])
+        if 'Author Info' not in found:
+            found.update(TRUST_TEXT_PATTERNS.match(self.document.text())['trust'])
+        signals = [label for label in TRUST_LINK_PATTERNS.labels() if label in found]
+
         status = "✅ Pass" if len(signals) >= 2 else "⚠️ Warning"
         return {
             "status": status,
@@ -136,6 +143,8 @@ class AeoVerifier:
         }
 
         for key, result in self.results.items():
+            if key == 'check_meta':
+                continue
             name = display_names.get(key, key.replace('_', ' ').title())
             status = result.get('status', '❓')
             details = result.get('details', '')
@@ -57,3 +57,64 @@ OPEN_BETA_MODE = _parse_bool_env("OPEN_BETA_MODE", "false")
 AUTH_TEMP_DISABLED = _parse_bool_env("AUTH_TEMP_DISABLED", "false")
 BILLING_TEMP_DISABLED = _parse_bool_env("BILLING_TEMP_DISABLED", "false")
 SEARCH_RANK_TEMP_DISABLED = _parse_bool_env("SEARCH_RANK_TEMP_DISABLED", "false")
+
+BROWSER_POOL_ENABLED = _parse_bool_env("BROWSER_POOL_ENABLED", "true")
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_CONTEXTS_PER_BROWSER = int(
+    os.getenv("BROWSER_POOL_CONTEXTS_PER_BROWSER", "8")
+)
+BROWSER_POOL_MAX_PAGES_PER_BROWSER = int(
+    os.getenv("BROWSER_POOL_MAX_PAGES_PER_BROWSER", "200")
+)
+BROWSER_POOL_MAX_MEMORY_MB = int(os.getenv("BROWSER_POOL_MAX_MEMORY_MB", "1024"))
+BROWSER_POOL_ACQUIRE_TIMEOUT_SEC = int(
+    os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT_SEC", "60")
+)
+
+SITEMAP_BATCH_WORKER_COUNT = int(os.getenv("SITEMAP_BATCH_WORKER_COUNT", "4"))
+SITEMAP_BATCH_SKIP_CHECKS = _parse_csv_env("SITEMAP_BATCH_SKIP_CHECKS", "")
+SITEMAP_FETCH_CONCURRENCY = int(os.getenv("SITEMAP_FETCH_CONCURRENCY", "8"))
+SITEMAP_BATCH_LEASE_SEC = int(os.getenv("SITEMAP_BATCH_LEASE_SEC", "300"))
+SITEMAP_BATCH_MAX_ATTEMPTS = int(os.getenv("SITEMAP_BATCH_MAX_ATTEMPTS", "3"))
+SITEMAP_BATCH_POLL_INTERVAL_SEC = int(os.getenv("SITEMAP_BATCH_POLL_INTERVAL_SEC", "5"))
+SITEMAP_BATCH_REAP_INTERVAL_SEC = int(os.getenv("SITEMAP_BATCH_REAP_INTERVAL_SEC", "60"))
+
+VERIFY_POOL_ENABLED = _parse_bool_env("VERIFY_POOL_ENABLED", "true")
+VERIFY_POOL_WORKERS = int(os.getenv("VERIFY_POOL_WORKERS", "0"))
+
+STATIC_FETCH_ENABLED = _parse_bool_env("STATIC_FETCH_ENABLED", "true")
+STATIC_FETCH_TIMEOUT_SEC = int(os.getenv("STATIC_FETCH_TIMEOUT_SEC", "10"))
+STATIC_FETCH_MIN_TEXT_CHARS = int(os.getenv("STATIC_FETCH_MIN_TEXT_CHARS", "200"))
+
+RENDER_READY_MAX_WAIT_MS = int(os.getenv("RENDER_READY_MAX_WAIT_MS", "2000"))
+RENDER_READY_QUIET_MS = int(os.getenv("RENDER_READY_QUIET_MS", "400"))
+
+ANALYSIS_BLOCKED_RESOURCE_TYPES = _parse_csv_env(
+    "ANALYSIS_BLOCKED_RESOURCE_TYPES", "media,font"
+)
+ANALYSIS_BLOCK_TRACKERS = _parse_bool_env("ANALYSIS_BLOCK_TRACKERS", "true")
+ANALYSIS_BLOCKED_HOSTS = _parse_csv_env("ANALYSIS_BLOCKED_HOSTS", "")
+
+PAGE_CACHE_ENABLED = _parse_bool_env("PAGE_CACHE_ENABLED", "true")
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "page_cache")
+PAGE_CACHE_TTL_SEC = int(os.getenv("PAGE_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+PAGE_CACHE_MAX_MB = int(os.getenv("PAGE_CACHE_MAX_MB", "512"))
+
+ANALYSIS_RESULT_CACHE_TTL_SEC = int(os.getenv("ANALYSIS_RESULT_CACHE_TTL_SEC", "60"))
+
+HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", "2"))
+HOST_MIN_DELAY_MS = int(os.getenv("HOST_MIN_DELAY_MS", "250"))
+HOST_MAX_BACKOFF_SEC = int(os.getenv("HOST_MAX_BACKOFF_SEC", "60"))
+HOST_MAX_CRAWL_DELAY_SEC = int(os.getenv("HOST_MAX_CRAWL_DELAY_SEC", "10"))
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "0"))
+HTTP_DNS_CACHE_TTL_SEC = int(os.getenv("HTTP_DNS_CACHE_TTL_SEC", "300"))
+HTTP_KEEPALIVE_TIMEOUT_SEC = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT_SEC", "30"))
+
+IMAGE_PROBE_CACHE_TTL_SEC = int(os.getenv("IMAGE_PROBE_CACHE_TTL_SEC", str(24 * 3600)))
+IMAGE_PROBE_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_PROBE_CACHE_MAX_ENTRIES", "20000"))
+IMAGE_PROBE_HOST_CONCURRENCY = int(os.getenv("IMAGE_PROBE_HOST_CONCURRENCY", "4"))
+IMAGE_PROBE_HEADER_BYTES = int(os.getenv("IMAGE_PROBE_HEADER_BYTES", "32768"))
+IMAGE_PROBE_MAX_PER_PAGE = int(os.getenv("IMAGE_PROBE_MAX_PER_PAGE", "20"))
+IMAGE_PROBE_PAGE_DEADLINE_SEC = float(os.getenv("IMAGE_PROBE_PAGE_DEADLINE_SEC", "3"))
@@ -18,7 +18,10 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def ensure_sqlite_compat_columns():
+def ensure_compat_columns():
+    if SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
+        ensure_postgres_compat_columns()
+        return
     if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
         return
 
@@ -34,7 +37,15 @@ def ensure_sqlite_compat_columns():
             "error_message": "TEXT",
             "response_share_url": "TEXT",
             "result_summary_json": "TEXT",
-        }
+        },
+        "sitemap_batch_jobs": {
+            "max_urls": "INTEGER",
+            "discovery_owner": "TEXT",
+        },
+        "sitemap_batch_items": {
+            "lease_owner": "TEXT",
+            "lease_expires_at": "DATETIME",
+        },
     }
 
     with engine.begin() as conn:
@@ -68,6 +79,45 @@ def ensure_sqlite_compat_columns():
         except SQLAlchemyError:
             pass
 
+        try:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_sitemap_batch_items_lease_expires_at ON sitemap_batch_items (lease_expires_at)"
+                )
+            )
+        except SQLAlchemyError:
+            pass
+
+
+def ensure_postgres_compat_columns():
+    # create_all never alters existing tables; these are columns added after
+    # the first release and must exist before the batch workers start.
+    required_columns = {
+        "sitemap_batch_jobs": {
+            "max_urls": "INTEGER",
+            "discovery_owner": "TEXT",
+        },
+        "sitemap_batch_items": {
+            "lease_owner": "TEXT",
+            "lease_expires_at": "TIMESTAMP WITH TIME ZONE",
+        },
+    }
+
+    with engine.begin() as conn:
+        for table_name, table_columns in required_columns.items():
+            for column_name, column_type in table_columns.items():
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column_name} {column_type}"
+                    )
+                )
+
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_sitemap_batch_items_lease_expires_at ON sitemap_batch_items (lease_expires_at)"
+            )
+        )
+
 
 def get_db():
     db = SessionLocal()
@@ -2,7 +2,7 @@ from fastapi import FastAPI, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .database import engine, Base, SessionLocal
 from . import database
-from .config import CORS_ORIGINS
+from .config import BROWSER_POOL_ENABLED, CORS_ORIGINS, SITEMAP_BATCH_WORKER_COUNT
 from .routes import auth, analyze
 import sys
 import asyncio
@@ -20,11 +20,19 @@ if sys.platform.startswith("win"):
 
 # Create Database Tables
 Base.metadata.create_all(bind=engine)
-database.ensure_sqlite_compat_columns()
+database.ensure_compat_columns()
 
 from .logger import setup_logger
 from .services.admin_seed_service import seed_admin_account
+from .services.analysis_service import AnalysisService
+from .services.browser_pool_service import browser_pool_service
+from .services.host_scheduler_service import host_scheduler_service
+from .services.http_session_service import http_session_service
+from .services.image_probe_service import image_probe_service
+from .services.page_cache_service import page_cache_service
+from .services.render_readiness_service import render_readiness_service
 from .services.sitemap_batch_service import sitemap_batch_service
+from .services.verification_pool_service import verification_pool_service
 
 logger = setup_logger("api.main")
 
@@ -60,12 +68,30 @@ async def startup_event():
     finally:
         db.close()
 
-    await sitemap_batch_service.start_workers(worker_count=2)
+    await http_session_service.start()
+
+    if BROWSER_POOL_ENABLED:
+        try:
+            await browser_pool_service.start()
+        except Exception as e:
+            logger.warning(
+                f"Browser pool unavailable, falling back to per-request browsers: {e}"
+            )
+
+    try:
+        verification_pool_service.start()
+    except Exception as e:
+        logger.warning(f"Verification pool unavailable, verifying inline: {e}")
+
+    await sitemap_batch_service.start_workers(worker_count=SITEMAP_BATCH_WORKER_COUNT)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await sitemap_batch_service.stop_workers()
+    verification_pool_service.stop()
+    await browser_pool_service.stop()
+    await http_session_service.stop()
     logger.info("Application shutting down...")
 
 
@@ -147,6 +173,22 @@ async def health_check(db: Session = Depends(get_db)):
     return {"status": "ok", "database": "connected"}
 
 
+@app.get("/health/metrics")
+async def health_metrics():
+    return {
+        "browser_pool": browser_pool_service.metrics(),
+        "fetch_tiers": dict(AnalysisService.FETCH_TIER_COUNTS),
+        "analysis_coalescing": AnalysisService.coalescing_metrics(),
+        "render_readiness": render_readiness_service.metrics(),
+        "page_cache": page_cache_service.metrics(),
+        "host_scheduler": host_scheduler_service.metrics(),
+        "http_session": http_session_service.metrics(),
+        "verification_pool": verification_pool_service.metrics(),
+        "image_probe": image_probe_service.metrics(),
+        "sitemap_batch": sitemap_batch_service.metrics(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -46,6 +46,8 @@ class SitemapBatchJob(Base):
     queued_urls = Column(Integer, default=0)
     completed_urls = Column(Integer, default=0)
     failed_urls = Column(Integer, default=0)
+    max_urls = Column(Integer, nullable=True)
+    discovery_owner = Column(String, nullable=True)
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
@@ -62,6 +64,8 @@ class SitemapBatchItem(Base):
     target_url = Column(String, nullable=False)
     status = Column(String, default="queued", index=True)
     attempts = Column(Integer, default=0)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
     error_message = Column(Text, nullable=True)
     report_json = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
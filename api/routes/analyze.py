@@ -45,6 +45,7 @@ class AnalyzeResponse(BaseModel):
     aeo_result: Optional[Dict[str, Any]] = None
     geo_result: Optional[Dict[str, Any]] = None
     pagespeed_result: Optional[Any] = None
+    fetch_meta: Optional[Dict[str, Any]] = None
     status: str
 
 
@@ -117,6 +118,7 @@ async def analyze_url(
         "aeo_result": results.get("aeo_result"),
         "geo_result": results.get("geo_result"),
         "pagespeed_result": results.get("pagespeed_result"),
+        "fetch_meta": results.get("fetch_meta"),
         "status": "completed",
     }
 
@@ -155,7 +157,7 @@ async def create_sitemap_batch_job(
         "status": job.status,
         "total_urls": job.total_urls,
         "queued_urls": job.queued_urls,
-        "message": "Sitemap batch job queued.",
+        "message": "Sitemap discovery started; poll the job for progress.",
     }
 
 
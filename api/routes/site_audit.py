@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from .. import database, models, auth
 from ..logger import setup_logger
+from ..services.host_scheduler_service import host_scheduler_service
 from pydantic import BaseModel
 import asyncio
 from playwright.sync_api import sync_playwright
@@ -68,7 +69,9 @@ async def run_site_audit(
         return results
 
     try:
-        audit_data = await asyncio.to_thread(crawl_site, request.url)
+        async with host_scheduler_service.slot(request.url):
+            audit_data = await asyncio.to_thread(crawl_site, request.url)
+        host_scheduler_service.record_response(request.url, audit_data["status_code"])
         return {"status": "success", "data": audit_data}
     except Exception as e:
         logger.error(f"Site Audit failed: {e}")
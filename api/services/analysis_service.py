@@ -1,42 +1,402 @@
 import asyncio
+import codecs
+import copy
+import re
 import time
-import aiohttp
-from playwright.sync_api import sync_playwright
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from playwright.async_api import async_playwright
+from ..config import (
+    ANALYSIS_RESULT_CACHE_TTL_SEC,
+    STATIC_FETCH_ENABLED,
+    STATIC_FETCH_MIN_TEXT_CHARS,
+)
 from ..logger import setup_logger
+from .browser_pool_service import browser_pool_service
+from .host_scheduler_service import host_scheduler_service
+from .http_session_service import http_session_service
+from .image_probe_service import image_probe_service
+from .page_cache_service import page_cache_service
+from .render_readiness_service import render_readiness_service
+from .request_policy_service import request_policy_service
+from .verification_pool_service import verification_pool_service
 
 # Fix: Import from root directory (sys.path includes root)
-from seo_verifier import SeoVerifier
-from aeo_verifier import AeoVerifier
+from seo_verifier import SEO_CHECKS, SeoVerifier
+from aeo_verifier import AEO_CHECKS, AeoVerifier
+from html_document import HTML_MAX_BYTES, DocumentIndex, truncate_html
 
 logger = setup_logger("api.services.analysis")
 
 
+SPA_ROOT_PATTERN = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>",
+    re.IGNORECASE,
+)
+NOSCRIPT_BLOCK_PATTERN = re.compile(
+    r"<noscript\b[^>]*>(.*?)</noscript\s*>", re.IGNORECASE | re.DOTALL
+)
+NOSCRIPT_JS_HINTS = (
+    "enable javascript",
+    "javascript is required",
+    "requires javascript",
+    "turn on javascript",
+    "자바스크립트",
+)
+NON_VISIBLE_BLOCK_PATTERN = re.compile(
+    r"<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# <meta charset=...> and <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_PATTERN = re.compile(
+    rb"<meta[^>]+?charset\s*=\s*[\"']?\s*([a-z0-9_.:-]+)", re.IGNORECASE
+)
+CHARSET_SNIFF_BYTES = 2048
+# Labels browsers decode as a superset encoding (WHATWG Encoding Standard)
+CHARSET_ALIASES = {
+    "euc-kr": "cp949",
+    "ks_c_5601-1987": "cp949",
+    "shift_jis": "cp932",
+    "x-sjis": "cp932",
+    "iso-8859-1": "cp1252",
+    "latin1": "cp1252",
+    "us-ascii": "cp1252",
+    "gb2312": "gbk",
+}
+
+# (normalized url, include_aeo, include_pagespeed, skipped checks)
+AnalysisKey = Tuple[str, bool, bool, Tuple[str, ...]]
+
+
+@dataclass
+class FetchResult:
+    html: str
+    tier: str
+    status_code: int = 0
+    final_url: str = ""
+    escalation_reason: Optional[str] = None
+    elapsed_ms: int = 0
+    render_wait_ms: int = 0
+    render_ready_signal: Optional[str] = None
+    assets: List[Dict[str, Any]] = field(default_factory=list)
+    asset_summary: Dict[str, Any] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    validators: Dict[str, str] = field(default_factory=dict)
+    cache_status: Optional[str] = None
+    truncated: bool = False
+
+    CACHED_HEADER_NAMES = (
+        "content-type",
+        "content-language",
+        "cache-control",
+        "etag",
+        "last-modified",
+        "link",
+        "x-robots-tag",
+    )
+
+    def to_cache_entry(self) -> Dict[str, Any]:
+        entry = asdict(self)
+        entry.pop("cache_status", None)
+        return entry
+
+    @classmethod
+    def from_cache_entry(cls, entry: Dict[str, Any]) -> "FetchResult":
+        known = {item.name for item in fields(cls)}
+        result = cls(**{key: value for key, value in entry.items() if key in known})
+        result.cache_status = "revalidated"
+        return result
+
+    @classmethod
+    def pick_headers(cls, headers: Any) -> Dict[str, str]:
+        picked = {}
+        for name in cls.CACHED_HEADER_NAMES:
+            value = headers.get(name)
+            if value:
+                picked[name] = value
+        return picked
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "tier": self.tier,
+            "cache_status": self.cache_status,
+            "status_code": self.status_code,
+            "final_url": self.final_url,
+            "escalation_reason": self.escalation_reason,
+            "elapsed_ms": self.elapsed_ms,
+            "render_wait_ms": self.render_wait_ms,
+            "render_ready_signal": self.render_ready_signal,
+            "assets": self.asset_summary,
+            "html_bytes": len(self.html.encode("utf-8", errors="ignore")),
+            "truncated": self.truncated,
+        }
+
+
 class AnalysisService:
+    BROWSER_CONTEXT_OPTIONS = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "viewport": {"width": 1920, "height": 1080},
+        "locale": "ko-KR",
+    }
+    STATIC_FETCH_HEADERS = {
+        "User-Agent": BROWSER_CONTEXT_OPTIONS["user_agent"],
+        "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    }
+    FETCH_TIER_COUNTS: Dict[str, int] = {"cache": 0, "static": 0, "rendered": 0}
+    COALESCING_COUNTS: Dict[str, int] = {
+        "executed": 0,
+        "coalesced": 0,
+        "result_cache_hits": 0,
+    }
+    RESULT_CACHE_MAX_ENTRIES = 256
+    _INFLIGHT: Dict[AnalysisKey, "asyncio.Task"] = {}
+    _RESULT_CACHE: "OrderedDict[AnalysisKey, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def detect_render_requirement(html: str) -> Optional[str]:
+        """Return why a statically fetched page still needs a browser, if it does."""
+        if len(html.strip()) < 512:
+            return "empty_document"
+
+        if SPA_ROOT_PATTERN.search(html):
+            return "spa_root_container"
+
+        for match in NOSCRIPT_BLOCK_PATTERN.finditer(html):
+            noscript_text = match.group(1).lower()
+            if any(hint in noscript_text for hint in NOSCRIPT_JS_HINTS):
+                return "noscript_javascript_hint"
+
+        visible = NON_VISIBLE_BLOCK_PATTERN.sub(" ", html)
+        visible = WHITESPACE_PATTERN.sub(" ", TAG_PATTERN.sub(" ", visible)).strip()
+        if len(visible) < STATIC_FETCH_MIN_TEXT_CHARS:
+            return "thin_static_text"
+
+        return None
+
+    @staticmethod
+    async def fetch_static(
+        url: str,
+        cached: Optional[Dict[str, Any]] = None,
+        revalidate_only: bool = False,
+    ) -> Tuple[Optional[FetchResult], str]:
+        """Plain HTTP fetch; returns (result, "") or (None, escalation reason).
+
+        With a cached entry the request is conditional and a 304 returns the
+        cached page. revalidate_only skips reading a changed body.
+        """
+        started = time.perf_counter()
+        request_headers = (
+            page_cache_service.conditional_headers(cached) if cached else {}
+        )
+        try:
+            async with http_session_service.session() as session, host_scheduler_service.slot(
+                url
+            ):
+                async with session.get(
+                    url,
+                    allow_redirects=True,
+                    headers={**AnalysisService.STATIC_FETCH_HEADERS, **request_headers},
+                    timeout=http_session_service.timeout("page"),
+                ) as response:
+                    host_scheduler_service.record_response(
+                        url, response.status, response.headers.get("Retry-After")
+                    )
+                    if cached and response.status == 304:
+                        result = FetchResult.from_cache_entry(cached)
+                        result.elapsed_ms = int((time.perf_counter() - started) * 1000)
+                        return result, ""
+                    if revalidate_only:
+                        return None, "static_tier_disabled"
+                    if response.status >= 400:
+                        return None, f"static_http_{response.status}"
+                    content_type = response.headers.get("Content-Type", "").lower()
+                    if "html" not in content_type:
+                        return None, "static_non_html"
+                    html, truncated = await AnalysisService._read_html(response)
+                    if AnalysisService._is_misdecoded(html):
+                        return None, "static_decode_error"
+                    status_code = response.status
+                    final_url = str(response.url)
+                    headers = FetchResult.pick_headers(response.headers)
+                    validators = page_cache_service.validators_from_headers(
+                        response.headers
+                    )
+        except Exception as e:
+            logger.debug(f"Static fetch failed for {url}: {e}")
+            return None, "static_fetch_error"
+
+        reason = AnalysisService.detect_render_requirement(html)
+        if reason:
+            return None, reason
+
+        return (
+            FetchResult(
+                html=html,
+                tier="static",
+                status_code=status_code,
+                final_url=final_url,
+                elapsed_ms=int((time.perf_counter() - started) * 1000),
+                headers=headers,
+                validators=validators,
+                truncated=truncated,
+            ),
+            "",
+        )
+
+    @staticmethod
+    async def _read_html(response) -> Tuple[str, bool]:
+        """Read a response body as text, stopping once it passes HTML_MAX_BYTES."""
+        chunks = []
+        received = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            received += len(chunk)
+            if HTML_MAX_BYTES and received > HTML_MAX_BYTES:
+                break
+        body = b"".join(chunks)
+        del chunks
+        html = body.decode(
+            AnalysisService.sniff_charset(body, response.charset), errors="replace"
+        )
+        del body
+        return truncate_html(html)
+
+    @staticmethod
+    def sniff_charset(body: bytes, header_charset: Optional[str] = None) -> str:
+        """Codec for an HTML body: BOM, then Content-Type charset, then <meta> in the first 2 KB."""
+        for bom, codec in (
+            (codecs.BOM_UTF8, "utf-8-sig"),
+            (codecs.BOM_UTF16_LE, "utf-16"),
+            (codecs.BOM_UTF16_BE, "utf-16"),
+        ):
+            if body.startswith(bom):
+                return codec
+
+        candidates = [header_charset]
+        match = META_CHARSET_PATTERN.search(body[:CHARSET_SNIFF_BYTES])
+        if match:
+            candidates.append(match.group(1).decode("ascii", errors="ignore"))
+        for label in candidates:
+            if not label:
+                continue
+            label = label.strip().lower()
+            codec = CHARSET_ALIASES.get(label, label)
+            try:
+                codecs.lookup(codec)
+            except LookupError:
+                continue
+            # A UTF-16 <meta> in a byte-readable document means UTF-8 (HTML spec)
+            return "utf-8" if codec.startswith("utf-16") else codec
+        return "utf-8"
+
+    @staticmethod
+    def _is_misdecoded(html: str) -> bool:
+        """True when decoding left many U+FFFD, i.e. the charset guess was wrong."""
+        replacements = html.count("\ufffd")
+        return replacements >= 8 and replacements * 1000 > len(html)
+
+    @staticmethod
+    async def fetch_url(url: str) -> FetchResult:
+        """Revalidate a cached copy, else static fetch, else headless rendering."""
+        cached = await page_cache_service.get(url)
+        escalation_reason = "static_tier_disabled"
+        if STATIC_FETCH_ENABLED or cached is not None:
+            static_result, escalation_reason = await AnalysisService.fetch_static(
+                url, cached=cached, revalidate_only=not STATIC_FETCH_ENABLED
+            )
+            if static_result is not None and static_result.cache_status:
+                page_cache_service.record_hit(url)
+                AnalysisService.FETCH_TIER_COUNTS["cache"] += 1
+                logger.debug(f"Served {url} from page cache (304)")
+                return static_result
+            if cached is not None:
+                page_cache_service.record_stale()
+            if static_result is not None:
+                AnalysisService.FETCH_TIER_COUNTS["static"] += 1
+                logger.debug(f"Served {url} from static tier")
+                await page_cache_service.put(url, static_result.to_cache_entry())
+                return static_result
+
+        logger.debug(f"Escalating {url} to rendered tier: {escalation_reason}")
+        result = await AnalysisService.render_url(url)
+        result.escalation_reason = escalation_reason
+        AnalysisService.FETCH_TIER_COUNTS["rendered"] += 1
+        await page_cache_service.put(url, result.to_cache_entry())
+        return result
+
     @staticmethod
-    def fetch_url_sync(url: str):
+    async def _render_page(context, url: str) -> FetchResult:
+        started = time.perf_counter()
+        recorder = request_policy_service.new_recorder()
+        await recorder.attach(context)
+        page = await context.new_page()
+        logger.debug(f"Navigating to {url}...")
+        response = await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        if response is not None:
+            host_scheduler_service.record_response(
+                url, response.status, response.headers.get("retry-after")
+            )
+        readiness = await render_readiness_service.wait_until_ready(page, url)
+        content, truncated = truncate_html(await page.content())
+        await recorder.drain()
+        response_headers = response.headers if response is not None else {}
+        logger.debug(
+            f"Content fetched successfully after {readiness['render_wait_ms']}ms "
+            f"({readiness['render_ready_signal']})."
+        )
+        return FetchResult(
+            html=content,
+            tier="rendered",
+            status_code=response.status if response is not None else 0,
+            final_url=page.url,
+            elapsed_ms=int((time.perf_counter() - started) * 1000),
+            render_wait_ms=readiness["render_wait_ms"],
+            render_ready_signal=readiness["render_ready_signal"],
+            assets=recorder.inventory(),
+            asset_summary=recorder.summary(),
+            headers=FetchResult.pick_headers(response_headers),
+            validators=page_cache_service.validators_from_headers(response_headers),
+            truncated=truncated,
+        )
+
+    @staticmethod
+    async def render_url(url: str) -> FetchResult:
+        """Render a URL on the event loop, sharing the warm browser pool when up."""
+        async with host_scheduler_service.slot(url):
+            return await AnalysisService._render_url(url)
+
+    @staticmethod
+    async def _render_url(url: str) -> FetchResult:
+        if browser_pool_service.started:
+            try:
+                async with browser_pool_service.context(
+                    **AnalysisService.BROWSER_CONTEXT_OPTIONS
+                ) as context:
+                    return await AnalysisService._render_page(context, url)
+            except Exception as e:
+                logger.error(f"Pooled fetch error: {e}")
+                raise e
+
         logger.debug(f"Starting browser to fetch: {url}")
         try:
-            with sync_playwright() as p:
+            async with async_playwright() as p:
                 logger.debug("Launching Chromium...")
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080},
-                    locale="ko-KR",
-                )
-                page = context.new_page()
+                browser = await p.chromium.launch(headless=True)
                 try:
-                    logger.debug(f"Navigating to {url}...")
-                    page.goto(url, timeout=30000, wait_until="domcontentloaded")
-                    page.wait_for_timeout(2000)  # Wait for JS
-                    content = page.content()
-                    logger.debug("Content fetched successfully.")
-                    return content
+                    context = await browser.new_context(
+                        **AnalysisService.BROWSER_CONTEXT_OPTIONS
+                    )
+                    return await AnalysisService._render_page(context, url)
                 except Exception as inner_e:
                     logger.error(f"Error inside Playwright context: {inner_e}")
                     raise inner_e
                 finally:
-                    browser.close()
+                    await browser.close()
                     logger.debug("Browser closed.")
         except Exception as e:
             logger.error(f"Playwright error: {e}")
@@ -48,11 +408,17 @@ class AnalysisService:
         load_time_ms = 0
 
         try:
-            timeout = aiohttp.ClientTimeout(total=15)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with http_session_service.session() as session, host_scheduler_service.slot(
+                url
+            ):
                 started = time.perf_counter()
-                async with session.get(url, allow_redirects=True) as response:
+                async with session.get(
+                    url, allow_redirects=True, timeout=http_session_service.timeout("geo")
+                ) as response:
                     status_code = response.status
+                    host_scheduler_service.record_response(
+                        url, status_code, response.headers.get("Retry-After")
+                    )
                     load_time_ms = int((time.perf_counter() - started) * 1000)
         except Exception:
             status_code = 0
@@ -65,27 +431,194 @@ class AnalysisService:
             "UK": {"status": status_code, "load_time_ms": load_time_ms},
         }
 
+    @staticmethod
+    def coalescing_metrics() -> Dict[str, Any]:
+        return {
+            **AnalysisService.COALESCING_COUNTS,
+            "in_flight": len(AnalysisService._INFLIGHT),
+            "cached_results": len(AnalysisService._RESULT_CACHE),
+        }
+
     @staticmethod
     async def analyze_url(
-        url: str, include_aeo: bool = False, include_pagespeed: bool = False
+        url: str,
+        include_aeo: bool = False,
+        include_pagespeed: bool = False,
+        skip_checks: Optional[Sequence[str]] = None,
+        offload_cpu: bool = False,
+    ):
+        """Analyze a URL, sharing one in-flight run between concurrent callers.
+
+        skip_checks names verifier checks (or cost labels such as "network")
+        to leave out of both the SEO and AEO passes. offload_cpu runs parsing
+        and cpu checks in the verification process pool when it is started.
+        """
+        skipped = tuple(sorted(set(skip_checks or ())))
+        # Rejected here, before anything is fetched or rendered
+        AnalysisService.split_skip_checks(skipped)
+        # The exact URL: canonical/hreflang self-references and relative
+        # links resolve against it, so /page and /page/ can score differently.
+        key = (
+            url,
+            bool(include_aeo),
+            bool(include_pagespeed),
+            skipped,
+        )
+        counts = AnalysisService.COALESCING_COUNTS
+
+        cached = AnalysisService._RESULT_CACHE.get(key)
+        if cached is not None:
+            stored_at, result = cached
+            if time.monotonic() - stored_at <= ANALYSIS_RESULT_CACHE_TTL_SEC:
+                counts["result_cache_hits"] += 1
+                return copy.deepcopy(result)
+            AnalysisService._RESULT_CACHE.pop(key, None)
+
+        inflight = AnalysisService._INFLIGHT.get(key)
+        if inflight is not None:
+            counts["coalesced"] += 1
+            logger.info(f"Joining in-flight analysis for {url}")
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        counts["executed"] += 1
+        task = asyncio.ensure_future(
+            AnalysisService._run_analysis(
+                url, include_aeo, include_pagespeed, skipped, offload_cpu
+            )
+        )
+        AnalysisService._INFLIGHT[key] = task
+        task.add_done_callback(lambda done: AnalysisService._finish_inflight(key, done))
+        return copy.deepcopy(await asyncio.shield(task))
+
+    @staticmethod
+    def split_skip_checks(
+        skip_checks: Sequence[str],
+    ) -> Tuple[List[str], List[str]]:
+        """Split skip_checks into (seo_skip, aeo_skip); unknown names raise ValueError."""
+        seo_check_names = set(SEO_CHECKS.names) | SEO_CHECKS.costs
+        aeo_check_names = set(AEO_CHECKS.names) | AEO_CHECKS.costs
+        unknown = set(skip_checks) - seo_check_names - aeo_check_names
+        if unknown:
+            raise ValueError(f"Unknown checks: {', '.join(sorted(unknown))}")
+        seo_skip = [name for name in skip_checks if name in seo_check_names]
+        aeo_skip = [name for name in skip_checks if name in aeo_check_names]
+        return seo_skip, aeo_skip
+
+    @staticmethod
+    def _finish_inflight(key: AnalysisKey, task: "asyncio.Task"):
+        AnalysisService._INFLIGHT.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if ANALYSIS_RESULT_CACHE_TTL_SEC <= 0:
+            return
+
+        result_cache = AnalysisService._RESULT_CACHE
+        result_cache[key] = (time.monotonic(), task.result())
+        result_cache.move_to_end(key)
+        while len(result_cache) > AnalysisService.RESULT_CACHE_MAX_ENTRIES:
+            result_cache.popitem(last=False)
+
+    @staticmethod
+    async def _verify_inline(
+        fetch_result: FetchResult,
+        url: str,
+        include_aeo: bool,
+        seo_skip: List[str],
+        aeo_skip: List[str],
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        # Parsed once; both verifiers read the same index.
+        document = DocumentIndex.from_html(fetch_result.html)
+        async with http_session_service.session() as http_session:
+            seo = SeoVerifier(
+                fetch_result.html,
+                url,
+                asset_inventory=fetch_result.assets,
+                host_scheduler=host_scheduler_service,
+                http_session=http_session,
+                document=document,
+                image_probe=image_probe_service,
+            )
+            seo_results = await seo.analyze(skip=seo_skip)
+
+        aeo_results = None
+        if include_aeo:
+            aeo_results = AeoVerifier(document=document).analyze(skip=aeo_skip)
+        return seo_results, aeo_results
+
+    @staticmethod
+    async def _verify_offloaded(
+        fetch_result: FetchResult,
+        url: str,
+        include_aeo: bool,
+        seo_skip: List[str],
+        aeo_skip: List[str],
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Parse and run cpu checks in the process pool; network checks stay here."""
+        try:
+            pooled = await verification_pool_service.verify(
+                fetch_result.html, url, include_aeo, seo_skip + aeo_skip
+            )
+        except Exception as e:
+            logger.warning(f"Verification pool failed for {url}, running inline: {e}")
+            return await AnalysisService._verify_inline(
+                fetch_result, url, include_aeo, seo_skip, aeo_skip
+            )
+
+        # The image probe only needs the <img> attributes the worker sent back.
+        document = DocumentIndex()
+        document.images = pooled["images"]
+        async with http_session_service.session() as http_session:
+            seo = SeoVerifier(
+                "",
+                url,
+                asset_inventory=fetch_result.assets,
+                host_scheduler=host_scheduler_service,
+                http_session=http_session,
+                document=document,
+                image_probe=image_probe_service,
+            )
+            network_results, network_meta = await SEO_CHECKS.run(
+                seo, only=["network"], skip=seo_skip
+            )
+
+        merged = {**pooled["seo_results"], **network_results}
+        seo_results = {name: merged[name] for name in SEO_CHECKS.names if name in merged}
+        seo_results["score"] = SEO_CHECKS.score(seo_results)
+
+        check_meta = pooled["seo_meta"]
+        timings = {**check_meta["timings_ms"], **network_meta["timings_ms"]}
+        check_meta["timings_ms"] = {name: timings[name] for name in seo_results if name in timings}
+        check_meta["skipped"] = [name for name in SEO_CHECKS.names if name not in merged]
+        check_meta["worker_ms"] = pooled["worker_ms"]
+        check_meta["executor"] = "process_pool"
+        seo_results["check_meta"] = check_meta
+        return seo_results, pooled["aeo_results"]
+
+    @staticmethod
+    async def _run_analysis(
+        url: str,
+        include_aeo: bool,
+        include_pagespeed: bool,
+        skip_checks: Tuple[str, ...] = (),
+        offload_cpu: bool = False,
     ):
         try:
+            seo_skip, aeo_skip = AnalysisService.split_skip_checks(skip_checks)
+
             # 1. Fetch Content
-            html_content = await asyncio.to_thread(AnalysisService.fetch_url_sync, url)
-
-            # 2. SEO Analysis
-            logger.info("Starting SEO Analysis...")
-            seo = SeoVerifier(html_content, url)
-            seo_results = await seo.analyze()
-            logger.info("SEO Analysis complete.")
-
-            # 3. AEO Analysis
-            aeo_results = None
-            if include_aeo:
-                logger.info("Starting AEO Analysis...")
-                aeo = AeoVerifier(html_content)
-                aeo_results = aeo.analyze()
-                logger.info("AEO Analysis complete.")
+            fetch_result = await AnalysisService.fetch_url(url)
+
+            # 2-3. SEO / AEO Analysis
+            logger.info("Starting SEO/AEO Analysis...")
+            if offload_cpu and verification_pool_service.started:
+                seo_results, aeo_results = await AnalysisService._verify_offloaded(
+                    fetch_result, url, include_aeo, seo_skip, aeo_skip
+                )
+            else:
+                seo_results, aeo_results = await AnalysisService._verify_inline(
+                    fetch_result, url, include_aeo, seo_skip, aeo_skip
+                )
+            logger.info("SEO/AEO Analysis complete.")
 
             geo_results = await AnalysisService.build_geo_snapshot(url)
 
@@ -98,9 +631,13 @@ class AnalysisService:
                 from api_manager import ApiManager
 
                 api_manager = ApiManager()
-                ps_checker = PageSpeedChecker(api_manager)
-
-                pagespeed_results = await ps_checker.analyze(url)
+                async with http_session_service.session() as http_session:
+                    ps_checker = PageSpeedChecker(
+                        api_manager,
+                        session=http_session,
+                        timeout=http_session_service.timeout("api"),
+                    )
+                    pagespeed_results = await ps_checker.analyze(url)
                 logger.info("PageSpeed Analysis complete.")
 
             return {
@@ -108,6 +645,7 @@ class AnalysisService:
                 "aeo_result": aeo_results,
                 "pagespeed_result": pagespeed_results,
                 "geo_result": geo_results,
+                "fetch_meta": fetch_result.meta(),
             }
 
         except Exception as e:
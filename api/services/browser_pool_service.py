@@ -0,0 +1,368 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from ..config import (
+    BROWSER_POOL_ACQUIRE_TIMEOUT_SEC,
+    BROWSER_POOL_CONTEXTS_PER_BROWSER,
+    BROWSER_POOL_MAX_MEMORY_MB,
+    BROWSER_POOL_MAX_PAGES_PER_BROWSER,
+    BROWSER_POOL_SIZE,
+)
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.browser_pool")
+
+
+@dataclass
+class PooledBrowser:
+    slot_id: int
+    browser: Optional[Browser] = None
+    launched_at: float = 0.0
+    pages_served: int = 0
+    active_contexts: int = 0
+    launching: bool = False
+    retiring: bool = False
+    last_rss_mb: Optional[float] = None
+    launch_failures: int = 0  # consecutive, reset by a successful launch
+    retry_at: float = 0.0  # monotonic time before which no relaunch starts
+
+
+class BrowserPoolService:
+    """Long-lived Chromium pool that hands out one isolated context per fetch."""
+
+    # Relaunch backoff after consecutive failed launches of a slot
+    RELAUNCH_BACKOFF_SEC = 1.0
+    RELAUNCH_BACKOFF_MAX_SEC = 60.0
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        contexts_per_browser: int = BROWSER_POOL_CONTEXTS_PER_BROWSER,
+        max_pages_per_browser: int = BROWSER_POOL_MAX_PAGES_PER_BROWSER,
+        max_memory_mb: int = BROWSER_POOL_MAX_MEMORY_MB,
+        acquire_timeout_sec: int = BROWSER_POOL_ACQUIRE_TIMEOUT_SEC,
+    ):
+        self.size = max(1, size)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages_per_browser = max(0, max_pages_per_browser)
+        self.max_memory_mb = max(0, max_memory_mb)
+        self.acquire_timeout_sec = max(1, acquire_timeout_sec)
+
+        self.started = False
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[PooledBrowser] = []
+        self._condition: Optional[asyncio.Condition] = None
+        # The loop only holds weak references to tasks; keep relaunches alive
+        self._relaunch_tasks: Set[asyncio.Task] = set()
+
+        self._waiting = 0
+        self._acquired_total = 0
+        self._acquire_timeouts = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._launches_total = 0
+        self._launch_failures = 0
+        self._recycled_total = 0
+
+    async def start(self):
+        if self.started:
+            return
+
+        self._condition = asyncio.Condition()
+        self._playwright = await async_playwright().start()
+        self._slots = [PooledBrowser(slot_id=index) for index in range(self.size)]
+        self.started = True
+
+        await asyncio.gather(
+            *(self._launch_slot(slot) for slot in self._slots),
+            return_exceptions=True,
+        )
+        ready = sum(1 for slot in self._slots if slot.browser is not None)
+        if ready == 0:
+            await self.stop()
+            raise RuntimeError("Browser pool could not launch any Chromium instance")
+
+        logger.info(
+            f"Browser pool warmed: {ready}/{self.size} browsers, "
+            f"{self.contexts_per_browser} contexts per browser"
+        )
+
+    async def stop(self):
+        if not self.started:
+            return
+
+        self.started = False
+        relaunches = list(self._relaunch_tasks)
+        for task in relaunches:
+            task.cancel()
+        await asyncio.gather(*relaunches, return_exceptions=True)
+        for slot in self._slots:
+            await self._close_browser(slot)
+        self._slots = []
+
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Playwright driver stop failed: {e}")
+            self._playwright = None
+
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+        logger.info("Browser pool stopped")
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        """Lease a fresh browser context; it is closed when the block exits."""
+        slot = await self._acquire_slot()
+        browser_context: Optional[BrowserContext] = None
+        try:
+            if slot.browser is None:
+                raise RuntimeError("Leased browser is no longer available")
+            browser_context = await slot.browser.new_context(**context_options)
+            yield browser_context
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    logger.debug(f"Browser context close failed: {e}")
+            await self._release_slot(slot)
+
+    def metrics(self) -> Dict[str, Any]:
+        capacity = len(self._slots) * self.contexts_per_browser
+        in_use = sum(slot.active_contexts for slot in self._slots)
+        return {
+            "started": self.started,
+            "size": self.size,
+            "contexts_per_browser": self.contexts_per_browser,
+            "capacity": capacity,
+            "in_use": in_use,
+            "occupancy": round(in_use / capacity, 3) if capacity else 0.0,
+            "waiting": self._waiting,
+            "acquired_total": self._acquired_total,
+            "acquire_timeouts": self._acquire_timeouts,
+            "wait_ms_avg": round(self._wait_ms_total / self._acquired_total, 1)
+            if self._acquired_total
+            else 0.0,
+            "wait_ms_max": round(self._wait_ms_max, 1),
+            "launches_total": self._launches_total,
+            "launch_failures": self._launch_failures,
+            "recycled_total": self._recycled_total,
+            "browsers": [
+                {
+                    "slot_id": slot.slot_id,
+                    "connected": slot.browser is not None,
+                    "active_contexts": slot.active_contexts,
+                    "pages_served": slot.pages_served,
+                    "uptime_sec": int(time.monotonic() - slot.launched_at)
+                    if slot.browser is not None
+                    else 0,
+                    "rss_mb": slot.last_rss_mb,
+                    "retiring": slot.retiring,
+                    "launch_failures": slot.launch_failures,
+                }
+                for slot in self._slots
+            ],
+        }
+
+    async def _acquire_slot(self) -> PooledBrowser:
+        if not self.started or self._condition is None:
+            raise RuntimeError("Browser pool is not started")
+
+        started = time.perf_counter()
+        deadline = started + self.acquire_timeout_sec
+        self._waiting += 1
+        try:
+            async with self._condition:
+                while True:
+                    if not self.started:
+                        raise RuntimeError("Browser pool is shutting down")
+
+                    slot = self._pick_slot()
+                    if slot is not None:
+                        slot.active_contexts += 1
+                        slot.pages_served += 1
+                        if (
+                            self.max_pages_per_browser
+                            and slot.pages_served >= self.max_pages_per_browser
+                        ):
+                            slot.retiring = True
+                        break
+
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._acquire_timeouts += 1
+                        raise TimeoutError(
+                            f"Timed out after {self.acquire_timeout_sec}s waiting for a pooled browser"
+                        )
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        continue
+        finally:
+            self._waiting -= 1
+
+        wait_ms = (time.perf_counter() - started) * 1000
+        self._acquired_total += 1
+        self._wait_ms_total += wait_ms
+        self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+        return slot
+
+    def _pick_slot(self) -> Optional[PooledBrowser]:
+        candidates = []
+        for slot in self._slots:
+            if slot.browser is None or not slot.browser.is_connected():
+                if not slot.launching and slot.active_contexts == 0:
+                    slot.browser = None
+                    slot.launching = True
+                    self._schedule_relaunch(slot)
+                continue
+            if slot.retiring or slot.active_contexts >= self.contexts_per_browser:
+                continue
+            candidates.append(slot)
+
+        if not candidates:
+            return None
+        return min(candidates, key=lambda slot: slot.active_contexts)
+
+    async def _release_slot(self, slot: PooledBrowser):
+        if self._condition is None:
+            return
+
+        should_retire = False
+        if self.max_memory_mb and slot.browser is not None and not slot.retiring:
+            slot.last_rss_mb = await self._measure_browser_rss_mb(slot.browser)
+            if slot.last_rss_mb is not None and slot.last_rss_mb >= self.max_memory_mb:
+                should_retire = True
+
+        async with self._condition:
+            slot.active_contexts = max(0, slot.active_contexts - 1)
+            if should_retire:
+                slot.retiring = True
+
+            if slot.retiring and slot.active_contexts == 0 and not slot.launching:
+                logger.info(
+                    f"Recycling pooled browser slot={slot.slot_id} "
+                    f"pages={slot.pages_served} rss_mb={slot.last_rss_mb}"
+                )
+                slot.launching = True
+                self._recycled_total += 1
+                self._schedule_relaunch(slot)
+
+            self._condition.notify_all()
+
+    def _schedule_relaunch(self, slot: PooledBrowser):
+        task = asyncio.create_task(self._relaunch_slot(slot))
+        self._relaunch_tasks.add(task)
+        task.add_done_callback(self._relaunch_tasks.discard)
+
+    async def _relaunch_slot(self, slot: PooledBrowser):
+        await self._close_browser(slot)
+        try:
+            # slot.launching stays set meanwhile, so _pick_slot does not
+            # schedule another relaunch while the backoff runs
+            delay = slot.retry_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._launch_slot(slot)
+        except Exception:
+            pass
+        finally:
+            if self._condition is not None:
+                async with self._condition:
+                    self._condition.notify_all()
+
+    async def _launch_slot(self, slot: PooledBrowser):
+        slot.launching = True
+        try:
+            if not self.started or self._playwright is None:
+                return
+            slot.browser = await self._playwright.chromium.launch(headless=True)
+            slot.launched_at = time.monotonic()
+            slot.pages_served = 0
+            slot.retiring = False
+            slot.last_rss_mb = None
+            slot.launch_failures = 0
+            self._launches_total += 1
+            logger.debug(f"Launched pooled browser slot={slot.slot_id}")
+        except Exception as e:
+            self._launch_failures += 1
+            slot.launch_failures += 1
+            backoff = min(
+                self.RELAUNCH_BACKOFF_MAX_SEC,
+                self.RELAUNCH_BACKOFF_SEC * 2 ** (slot.launch_failures - 1),
+            )
+            slot.retry_at = time.monotonic() + backoff
+            logger.error(
+                f"Pooled browser launch failed slot={slot.slot_id} "
+                f"attempt={slot.launch_failures} retry_in={backoff:.1f}s: {e}"
+            )
+            raise
+        finally:
+            slot.launching = False
+
+    async def _close_browser(self, slot: PooledBrowser):
+        browser = slot.browser
+        slot.browser = None
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.debug(f"Pooled browser close failed slot={slot.slot_id}: {e}")
+
+    @staticmethod
+    async def _measure_browser_rss_mb(browser: Browser) -> Optional[float]:
+        """Sum resident memory of every Chromium process owned by the browser."""
+        try:
+            session = await browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception:
+            return None
+
+        pids = [int(row.get("id", 0)) for row in info.get("processInfo", []) or []]
+        total_bytes = 0
+        measured = False
+        for pid in pids:
+            rss = BrowserPoolService._process_rss_bytes(pid)
+            if rss is not None:
+                total_bytes += rss
+                measured = True
+
+        if not measured:
+            return None
+        return round(total_bytes / (1024 * 1024), 1)
+
+    @staticmethod
+    def _process_rss_bytes(pid: int) -> Optional[int]:
+        if pid <= 0:
+            return None
+
+        try:
+            psutil_module = import_module("psutil")
+            return int(psutil_module.Process(pid).memory_info().rss)
+        except Exception:
+            pass
+
+        try:
+            with open(f"/proc/{pid}/statm", "r", encoding="utf-8") as f:
+                resident_pages = int(f.read().split()[1])
+            return resident_pages * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            return None
+
+
+browser_pool_service = BrowserPoolService()
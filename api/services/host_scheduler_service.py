@@ -0,0 +1,247 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+from ..config import (
+    HOST_MAX_BACKOFF_SEC,
+    HOST_MAX_CONCURRENCY,
+    HOST_MAX_CRAWL_DELAY_SEC,
+    HOST_MIN_DELAY_MS,
+)
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.host_scheduler")
+
+
+@dataclass
+class HostState:
+    limit: int
+    active: int = 0
+    users: int = 0  # callers inside slot(), waiting or running
+    next_allowed_at: float = 0.0
+    crawl_delay_sec: float = 0.0
+    backoff_sec: float = 0.0
+    success_streak: int = 0
+    requests_total: int = 0
+    throttled_total: int = 0
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+
+class HostSchedulerService:
+    """Per-host concurrency and rate limiting shared by every outbound crawl."""
+
+    RECOVERY_STREAK = 10
+    THROTTLE_STATUSES = {429, 503}
+    # Idle hosts beyond this are dropped, least recently used first
+    MAX_TRACKED_HOSTS = 4096
+
+    def __init__(
+        self,
+        max_concurrency: int = HOST_MAX_CONCURRENCY,
+        min_delay_ms: int = HOST_MIN_DELAY_MS,
+        max_backoff_sec: int = HOST_MAX_BACKOFF_SEC,
+        max_crawl_delay_sec: int = HOST_MAX_CRAWL_DELAY_SEC,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_delay_sec = max(0, min_delay_ms) / 1000
+        self.max_backoff_sec = max(1, max_backoff_sec)
+        self.max_crawl_delay_sec = max(0, max_crawl_delay_sec)
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+        self._evicted_total = 0
+        self._wait_ms_total = 0.0
+        self._acquired_total = 0
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        return (urlparse(url).hostname or "").lower()
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's concurrency slots, spaced by its request interval."""
+        host = self.host_key(url)
+        if not host:
+            yield
+            return
+
+        state = self._state(host)
+        state.users += 1
+        started = time.monotonic()
+        try:
+            async with state.condition:
+                while state.active >= state.limit:
+                    await state.condition.wait()
+                state.active += 1
+
+                now = time.monotonic()
+                start_at = max(now, state.next_allowed_at)
+                state.next_allowed_at = start_at + self._interval(state)
+                state.requests_total += 1
+        except BaseException:
+            state.users -= 1
+            raise
+
+        try:
+            delay = start_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._acquired_total += 1
+            self._wait_ms_total += (time.monotonic() - started) * 1000
+            yield
+        finally:
+            async with state.condition:
+                state.active -= 1
+                state.users -= 1
+                state.condition.notify_all()
+
+    def record_response(
+        self, url: str, status: int, retry_after: Optional[str] = None
+    ):
+        """Back off on 429/503 (honouring Retry-After) and recover on success."""
+        host = self.host_key(url)
+        if not host:
+            return
+
+        state = self._state(host)
+        if status in self.THROTTLE_STATUSES:
+            state.throttled_total += 1
+            state.success_streak = 0
+            state.backoff_sec = min(
+                self.max_backoff_sec, max(1.0, state.backoff_sec * 2)
+            )
+            state.limit = max(1, state.limit // 2)
+            pause = self._parse_retry_after(retry_after)
+            if pause is None:
+                pause = state.backoff_sec
+            state.next_allowed_at = max(
+                state.next_allowed_at, time.monotonic() + min(pause, self.max_backoff_sec)
+            )
+            logger.warning(
+                f"Host {host} throttled with {status}; backoff={state.backoff_sec:.1f}s "
+                f"concurrency={state.limit}"
+            )
+            return
+
+        if 0 < status < 400:
+            state.success_streak += 1
+            if state.backoff_sec:
+                state.backoff_sec = state.backoff_sec / 2 if state.backoff_sec > 0.1 else 0.0
+            if (
+                state.success_streak >= self.RECOVERY_STREAK
+                and state.limit < self.max_concurrency
+            ):
+                state.limit += 1
+                state.success_streak = 0
+
+    def set_crawl_delay(self, url_or_host: str, delay_sec: float):
+        host = self.host_key(url_or_host) if "://" in url_or_host else url_or_host.lower()
+        if not host:
+            return
+        self._state(host).crawl_delay_sec = min(
+            max(0.0, float(delay_sec)), self.max_crawl_delay_sec
+        )
+
+    @staticmethod
+    def parse_crawl_delay(robots_text: str, user_agent: str = "*") -> Optional[float]:
+        """Crawl-delay for the matching (or wildcard) user-agent group of robots.txt."""
+        agent = user_agent.lower()
+        current_agents = []
+        in_rules = False
+        delays: Dict[str, float] = {}
+        for raw_line in robots_text.splitlines():
+            line = raw_line.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            name, value = [part.strip() for part in line.split(":", 1)]
+            name = name.lower()
+            if name == "user-agent":
+                if in_rules:
+                    current_agents = []
+                    in_rules = False
+                current_agents.append(value.lower())
+                continue
+            in_rules = True
+            if name == "crawl-delay":
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for item in current_agents:
+                    delays[item] = delay
+
+        if agent in delays:
+            return delays[agent]
+        return delays.get("*")
+
+    def metrics(self) -> Dict[str, Any]:
+        throttled_hosts = {
+            host: {
+                "limit": state.limit,
+                "backoff_sec": round(state.backoff_sec, 2),
+                "throttled_total": state.throttled_total,
+            }
+            for host, state in self._hosts.items()
+            if state.throttled_total
+        }
+        return {
+            "max_concurrency_per_host": self.max_concurrency,
+            "min_delay_ms": int(self.min_delay_sec * 1000),
+            "tracked_hosts": len(self._hosts),
+            "evicted_hosts": self._evicted_total,
+            "active_requests": sum(state.active for state in self._hosts.values()),
+            "acquired_total": self._acquired_total,
+            "wait_ms_avg": round(self._wait_ms_total / self._acquired_total, 1)
+            if self._acquired_total
+            else 0.0,
+            "throttled_hosts": throttled_hosts,
+        }
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(limit=self.max_concurrency)
+            self._hosts[host] = state
+            if len(self._hosts) > self.MAX_TRACKED_HOSTS:
+                self._evict_idle()
+        else:
+            self._hosts.move_to_end(host)
+        return state
+
+    def _evict_idle(self):
+        # Only hosts nobody is using, with no pending spacing, backoff, reduced
+        # limit or robots crawl-delay are dropped; a fresh state is equivalent.
+        now = time.monotonic()
+        excess = len(self._hosts) - self.MAX_TRACKED_HOSTS
+        for host, state in list(self._hosts.items()):
+            if excess <= 0:
+                break
+            if (
+                state.users
+                or state.next_allowed_at > now
+                or state.backoff_sec
+                or state.crawl_delay_sec
+                or state.limit < self.max_concurrency
+            ):
+                continue
+            del self._hosts[host]
+            self._evicted_total += 1
+            excess -= 1
+
+    def _interval(self, state: HostState) -> float:
+        return max(self.min_delay_sec, state.crawl_delay_sec, state.backoff_sec)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value.strip()))
+        except ValueError:
+            return None
+
+
+host_scheduler_service = HostSchedulerService()
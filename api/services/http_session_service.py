@@ -0,0 +1,112 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from ..config import (
+    HTTP_DNS_CACHE_TTL_SEC,
+    HTTP_KEEPALIVE_TIMEOUT_SEC,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    STATIC_FETCH_TIMEOUT_SEC,
+)
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.http_session")
+
+
+class HttpSessionService:
+    """Application-scoped aiohttp session with a pooled, DNS-caching connector."""
+
+    # Total seconds per kind of outbound call; connect is bounded separately so
+    # a dead host fails fast even when the overall budget is generous.
+    TIMEOUT_PROFILES: Dict[str, Dict[str, float]] = {
+        "page": {"total": STATIC_FETCH_TIMEOUT_SEC, "connect": 5},
+        "probe": {"total": 3, "connect": 2},
+        "geo": {"total": 15, "connect": 5},
+        "sitemap": {"total": 30, "connect": 5},
+        "robots": {"total": 20, "connect": 5},
+        "api": {"total": 30, "connect": 5},
+    }
+
+    def __init__(
+        self,
+        limit: int = HTTP_POOL_LIMIT,
+        limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl_sec: int = HTTP_DNS_CACHE_TTL_SEC,
+        keepalive_timeout_sec: int = HTTP_KEEPALIVE_TIMEOUT_SEC,
+    ):
+        self.limit = max(0, limit)
+        self.limit_per_host = max(0, limit_per_host)
+        self.dns_cache_ttl_sec = max(0, dns_cache_ttl_sec)
+        self.keepalive_timeout_sec = max(0, keepalive_timeout_sec)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._leases_total = 0
+        self._transient_sessions = 0
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def start(self):
+        if self.started:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl_sec or None,
+            use_dns_cache=self.dns_cache_ttl_sec > 0,
+            keepalive_timeout=self.keepalive_timeout_sec,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout("page")
+        )
+        logger.info(
+            f"Shared HTTP session ready: limit={self.limit} "
+            f"limit_per_host={self.limit_per_host} dns_ttl={self.dns_cache_ttl_sec}s"
+        )
+
+    async def stop(self):
+        session = self._session
+        self._session = None
+        if session is None or session.closed:
+            return
+        await session.close()
+        logger.info("Shared HTTP session closed")
+
+    def timeout(self, purpose: str) -> aiohttp.ClientTimeout:
+        profile = self.TIMEOUT_PROFILES.get(purpose, self.TIMEOUT_PROFILES["page"])
+        return aiohttp.ClientTimeout(**profile)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Yield the shared session, or a short-lived one outside the app lifespan.
+
+        Callers pass ``timeout=http_session_service.timeout(purpose)`` per request
+        and must not close the yielded session.
+        """
+        if self.started:
+            self._leases_total += 1
+            yield self._session
+            return
+
+        self._transient_sessions += 1
+        async with aiohttp.ClientSession(timeout=self.timeout("page")) as session:
+            yield session
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_cache_ttl_sec": self.dns_cache_ttl_sec,
+            "keepalive_timeout_sec": self.keepalive_timeout_sec,
+            "leases_total": self._leases_total,
+            "transient_sessions": self._transient_sessions,
+        }
+
+
+http_session_service = HttpSessionService()
@@ -0,0 +1,317 @@
+import asyncio
+import struct
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from ..config import (
+    IMAGE_PROBE_CACHE_MAX_ENTRIES,
+    IMAGE_PROBE_CACHE_TTL_SEC,
+    IMAGE_PROBE_HEADER_BYTES,
+    IMAGE_PROBE_HOST_CONCURRENCY,
+    IMAGE_PROBE_MAX_PER_PAGE,
+    IMAGE_PROBE_PAGE_DEADLINE_SEC,
+)
+from ..logger import setup_logger
+from .host_scheduler_service import host_scheduler_service
+from .http_session_service import http_session_service
+
+
+logger = setup_logger("api.services.image_probe")
+
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def sniff_image(data: bytes) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """(format, width, height) read from the first bytes of an image file."""
+    try:
+        if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", data[16:24])
+            return "png", width, height
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            width, height = struct.unpack("<HH", data[6:10])
+            return "gif", width, height
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            chunk = data[12:16]
+            if chunk == b"VP8 ":
+                width, height = struct.unpack("<HH", data[26:30])
+                return "webp", width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L":
+                bits = int.from_bytes(data[21:25], "little")
+                return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                width = int.from_bytes(data[24:27], "little") + 1
+                height = int.from_bytes(data[27:30], "little") + 1
+                return "webp", width, height
+            return "webp", None, None
+        if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+            box = data.find(b"ispe")
+            if box != -1 and len(data) >= box + 16:
+                width, height = struct.unpack(">II", data[box + 8 : box + 16])
+                return "avif", width, height
+            return "avif", None, None
+        if data.startswith(b"\xff\xd8"):
+            return ("jpeg",) + _jpeg_size(data)
+        head = data[:512].lstrip().lower()
+        if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+            return "svg", None, None
+    except struct.error:
+        pass
+    return None, None, None
+
+
+def _jpeg_size(data: bytes) -> Tuple[Optional[int], Optional[int]]:
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            position += 1
+            continue
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+            return width, height
+        position += 2 + int.from_bytes(data[position + 2 : position + 4], "big")
+    return None, None
+
+
+def _range_total(content_range: Optional[str]) -> Optional[int]:
+    # "bytes 0-32767/145623"
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+class ImageProbeService:
+    """Size, type and dimensions of image URLs, cached across analyses and batch items.
+
+    Each URL is probed with HEAD; when that gives no Content-Length (or HEAD
+    is refused) a ranged GET of the first header bytes supplies the size via
+    Content-Range and the dimensions. Every request goes through the host
+    scheduler (crawl-delay, spacing and 429/503 backoff) under an extra
+    per-host cap, and concurrent probes of one URL share a single request.
+    A page waits at most page_deadline_sec for its probes; the ones still
+    queued behind the host's spacing finish in the background for the cache.
+    """
+
+    REFUSED_HEAD_STATUSES = {403, 405, 501}
+    FAILURE_TTL_SEC = 300
+
+    def __init__(
+        self,
+        ttl_sec: int = IMAGE_PROBE_CACHE_TTL_SEC,
+        max_entries: int = IMAGE_PROBE_CACHE_MAX_ENTRIES,
+        host_concurrency: int = IMAGE_PROBE_HOST_CONCURRENCY,
+        header_bytes: int = IMAGE_PROBE_HEADER_BYTES,
+        max_per_page: int = IMAGE_PROBE_MAX_PER_PAGE,
+        page_deadline_sec: float = IMAGE_PROBE_PAGE_DEADLINE_SEC,
+    ):
+        self.ttl_sec = max(0, ttl_sec)
+        self.max_entries = max(1, max_entries)
+        self.host_concurrency = max(1, host_concurrency)
+        self.header_bytes = max(64, header_bytes)
+        self.max_per_page = max(0, max_per_page)
+        self.page_deadline_sec = max(0.0, page_deadline_sec)
+
+        # url -> (expires_at, info), least recently used first
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        # host -> [semaphore, probes holding or waiting]; dropped when idle
+        self._host_limits: Dict[str, List[Any]] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._partial_gets = 0
+        self._failures = 0
+        self._deadline_skipped = 0
+
+    async def probe_many(
+        self, urls: Iterable[str], session: Optional[aiohttp.ClientSession] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Probe each distinct URL (up to max_per_page, 0 = all); {url: info}.
+
+        URLs not probed by the page deadline are left out of the result.
+        """
+        unique = list(dict.fromkeys(urls))
+        if self.max_per_page:
+            unique = unique[: self.max_per_page]
+        if not unique:
+            return {}
+
+        if session is None:
+            async with http_session_service.session() as shared_session:
+                return await self.probe_many(unique, session=shared_session)
+
+        tasks = {url: asyncio.ensure_future(self.probe(url, session)) for url in unique}
+        _, pending = await asyncio.wait(
+            tasks.values(), timeout=self.page_deadline_sec or None
+        )
+        # probe() waits through a shield, so the fetch itself keeps running
+        for task in pending:
+            task.cancel()
+        self._deadline_skipped += len(pending)
+        return {
+            url: task.result()
+            for url, task in tasks.items()
+            if task not in pending and task.exception() is None
+        }
+
+    async def probe(self, url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        cached = self._cache_get(url)
+        if cached is not None:
+            self._hits += 1
+            return cached
+
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self._misses += 1
+        task = asyncio.ensure_future(self._fetch(url, session))
+        self._inflight[url] = task
+        task.add_done_callback(lambda done: self._finish(url, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, url: str, task: "asyncio.Future"):
+        self._inflight.pop(url, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        info = task.result()
+        if info.pop("aborted", False):
+            return
+        ok = 0 < info["status"] < 400 and info["size_bytes"] is not None
+        ttl = self.ttl_sec if ok else min(self.ttl_sec, self.FAILURE_TTL_SEC)
+        if ttl <= 0:
+            return
+        self._cache[url] = (time.monotonic() + ttl, info)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires_at, info = entry
+        if time.monotonic() >= expires_at:
+            self._cache.pop(url, None)
+            return None
+        self._cache.move_to_end(url)
+        return info
+
+    @asynccontextmanager
+    async def _host_limit(self, url: str) -> AsyncIterator[None]:
+        host = host_scheduler_service.host_key(url)
+        entry = self._host_limits.get(host)
+        if entry is None:
+            entry = self._host_limits[host] = [
+                asyncio.Semaphore(self.host_concurrency),
+                0,
+            ]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1] and self._host_limits.get(host) is entry:
+                del self._host_limits[host]
+
+    async def _fetch(self, url: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
+        info: Dict[str, Any] = {
+            "status": 0,
+            "size_bytes": None,
+            "content_type": "",
+            "format": None,
+            "width": None,
+            "height": None,
+            "method": "head",
+        }
+        timeout = http_session_service.timeout("probe")
+        try:
+            async with self._host_limit(url):
+                async with host_scheduler_service.slot(url), session.head(
+                    url, allow_redirects=True, timeout=timeout
+                ) as response:
+                    self._record(info, url, response)
+                    length = response.headers.get("Content-Length", "")
+                if info["status"] < 400 and length.isdigit():
+                    info["size_bytes"] = int(length)
+                    return info
+                if info["status"] >= 400 and info["status"] not in self.REFUSED_HEAD_STATUSES:
+                    return info
+
+                self._partial_gets += 1
+                info["method"] = "range_get"
+                async with host_scheduler_service.slot(url), session.get(
+                    url,
+                    allow_redirects=True,
+                    headers={"Range": f"bytes=0-{self.header_bytes - 1}"},
+                    timeout=timeout,
+                ) as response:
+                    self._record(info, url, response)
+                    if response.status >= 400:
+                        return info
+                    total = _range_total(response.headers.get("Content-Range"))
+                    length = response.headers.get("Content-Length", "")
+                    if total is None and response.status == 200 and length.isdigit():
+                        total = int(length)
+                    data = await self._read_head(response)
+
+                info["size_bytes"] = total
+                info["format"], info["width"], info["height"] = sniff_image(data)
+        except Exception as e:
+            if session.closed:
+                # The caller's short-lived session ended after its deadline;
+                # nothing is known about the image, so do not cache a failure.
+                info["aborted"] = True
+                return info
+            self._failures += 1
+            logger.debug(f"Image probe failed for {url}: {e}")
+        return info
+
+    @staticmethod
+    def _record(info: Dict[str, Any], url: str, response: aiohttp.ClientResponse):
+        info["status"] = response.status
+        info["content_type"] = response.headers.get("Content-Type", "").lower()
+        host_scheduler_service.record_response(
+            url, response.status, response.headers.get("Retry-After")
+        )
+
+    async def _read_head(self, response: aiohttp.ClientResponse) -> bytes:
+        # Servers that ignore Range send the whole file; stop at header_bytes.
+        data = b""
+        while len(data) < self.header_bytes:
+            chunk = await response.content.read(self.header_bytes - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._cache),
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "partial_gets": self._partial_gets,
+            "failures": self._failures,
+            "deadline_skipped": self._deadline_skipped,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "hosts": len(self._host_limits),
+        }
+
+
+image_probe_service = ImageProbeService()
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse, urlunparse
+
+from ..config import (
+    PAGE_CACHE_DIR,
+    PAGE_CACHE_ENABLED,
+    PAGE_CACHE_MAX_MB,
+    PAGE_CACHE_TTL_SEC,
+)
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.page_cache")
+
+
+class PageCacheService:
+    """On-disk store of fetched pages plus the validators needed to revalidate them.
+
+    An entry file's mtime is its last validation: set when stored and touched
+    on every 304. The TTL and LRU eviction both run on it, so a page that keeps
+    revalidating stays cached however old its body is.
+
+    File I/O runs in worker threads. The cache size is kept as a running total,
+    and the directory is only scanned when the total passes the limit or
+    after every RESCAN_EVERY stores.
+    """
+
+    RESCAN_EVERY = 500
+    # Eviction frees down to this share of the limit, so a full cache is not rescanned per store
+    EVICT_TO_RATIO = 0.9
+
+    def __init__(
+        self,
+        cache_dir: str = PAGE_CACHE_DIR,
+        ttl_sec: int = PAGE_CACHE_TTL_SEC,
+        max_mb: int = PAGE_CACHE_MAX_MB,
+        enabled: bool = PAGE_CACHE_ENABLED,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_sec = max(0, ttl_sec)
+        self.max_bytes = max(0, max_mb) * 1024 * 1024
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # unknown until the first scan
+        self._stores_since_scan = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._stores = 0
+        self._evictions = 0
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        parsed = urlparse((url or "").strip())
+        if not parsed.scheme:
+            return ""
+
+        return urlunparse(
+            (
+                parsed.scheme.lower(),
+                parsed.netloc.lower(),
+                parsed.path.rstrip("/") or "/",
+                "",
+                parsed.query,
+                "",
+            )
+        )
+
+    @staticmethod
+    def validators_from_headers(headers: Any) -> Dict[str, str]:
+        validators: Dict[str, str] = {}
+        etag = headers.get("etag") or headers.get("ETag")
+        last_modified = headers.get("last-modified") or headers.get("Last-Modified")
+        if etag:
+            validators["etag"] = etag
+        if last_modified:
+            validators["last_modified"] = last_modified
+        return validators
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        validators = entry.get("validators") or {}
+        headers: Dict[str, str] = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    async def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a URL, or None when absent or not validated within the TTL."""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._get, url)
+
+    def _get(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._entry_path(url)
+        try:
+            validated_at = path.stat().st_mtime if path is not None else None
+        except OSError:
+            validated_at = None
+        if validated_at is None:
+            self._misses += 1
+            return None
+
+        if self.ttl_sec and time.time() - validated_at > self.ttl_sec:
+            self._remove(path)
+            self._evictions += 1
+            self._misses += 1
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            logger.warning(f"Dropping unreadable page cache entry {path.name}: {e}")
+            self._remove(path)
+            self._misses += 1
+            return None
+
+        return entry
+
+    def record_hit(self, url: str):
+        """Count a 304 revalidation; restarts the entry's TTL and marks it recently used."""
+        self._hits += 1
+        path = self._entry_path(url)
+        if path is not None:
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+    def record_stale(self):
+        self._stale += 1
+
+    async def put(self, url: str, entry: Dict[str, Any]):
+        if not self.enabled or not entry.get("validators"):
+            return
+        await asyncio.to_thread(self._put, url, entry)
+
+    def _put(self, url: str, entry: Dict[str, Any]):
+        path = self._entry_path(url)
+        if path is None:
+            return
+
+        payload = dict(entry)
+        payload["url"] = self.normalize_url(url)
+        payload["stored_at"] = time.time()
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            size = tmp_path.stat().st_size
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            self._stores += 1
+        except Exception as e:
+            logger.warning(f"Page cache write failed for {url}: {e}")
+            return
+
+        with self._lock:
+            self._stores_since_scan += 1
+            if self._total_bytes is not None:
+                self._total_bytes += size - replaced
+            if (
+                self._total_bytes is None
+                or self._stores_since_scan >= self.RESCAN_EVERY
+                or (self.max_bytes and self._total_bytes > self.max_bytes)
+            ):
+                self._enforce_limits()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses + self._stale
+        return {
+            "enabled": self.enabled,
+            "hits": self._hits,
+            "misses": self._misses,
+            "stale": self._stale,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            "stores": self._stores,
+            "evictions": self._evictions,
+            "size_bytes": self._total_bytes,
+        }
+
+    def _entry_path(self, url: str) -> Optional[Path]:
+        key = self.normalize_url(url)
+        if not key:
+            return None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _enforce_limits(self):
+        """Rescan the directory: drop expired entries, then least recently used ones.
+
+        Called with the lock held; resets the running size total.
+        """
+        self._stores_since_scan = 0
+        try:
+            entries = [
+                (entry.stat().st_mtime, entry.stat().st_size, Path(entry.path))
+                for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name.endswith(".json")
+            ]
+        except OSError:
+            return
+
+        now = time.time()
+        live = []
+        for mtime, size, path in entries:
+            # mtime is the last store or 304, for both the TTL and the LRU order
+            if self.ttl_sec and now - mtime > self.ttl_sec:
+                self._unlink(path)
+                self._evictions += 1
+            else:
+                live.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in live)
+        if self.max_bytes and total > self.max_bytes:
+            target = self.max_bytes * self.EVICT_TO_RATIO
+            for _, size, path in sorted(live):
+                if total <= target:
+                    break
+                self._unlink(path)
+                self._evictions += 1
+                total -= size
+        self._total_bytes = total
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        self._unlink(path)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(0, self._total_bytes - size)
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+page_cache_service = PageCacheService()
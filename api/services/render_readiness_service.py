@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from ..config import RENDER_READY_MAX_WAIT_MS, RENDER_READY_QUIET_MS
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.render_readiness")
+
+
+DOM_QUIET_SCRIPT = """
+({ quietMs, maxMs }) => new Promise((resolve) => {
+  let quietTimer = null
+  let hardStop = null
+  let observer = null
+  const finish = (signal) => {
+    if (observer) observer.disconnect()
+    clearTimeout(quietTimer)
+    clearTimeout(hardStop)
+    resolve(signal)
+  }
+  const arm = () => {
+    clearTimeout(quietTimer)
+    quietTimer = setTimeout(() => finish('dom_quiet'), quietMs)
+  }
+  observer = new MutationObserver(arm)
+  observer.observe(document.documentElement || document, {
+    childList: true,
+    subtree: true,
+    attributes: true,
+    characterData: true,
+  })
+  hardStop = setTimeout(() => finish('max_wait'), maxMs)
+  arm()
+})
+"""
+
+
+class RenderReadinessService:
+    """Waits until a rendered page stops changing instead of sleeping a fixed time."""
+
+    EMA_ALPHA = 0.3
+    MAX_TRACKED_HOSTS = 5000
+
+    def __init__(
+        self,
+        max_wait_ms: int = RENDER_READY_MAX_WAIT_MS,
+        quiet_ms: int = RENDER_READY_QUIET_MS,
+    ):
+        self.max_wait_ms = max(0, max_wait_ms)
+        self.quiet_ms = max(50, quiet_ms)
+        self._host_ema_ms: "OrderedDict[str, float]" = OrderedDict()
+        self._waits_total = 0
+        self._wait_ms_total = 0
+        self._signal_counts: Dict[str, int] = {}
+
+    def budget_for(self, url: str) -> int:
+        """Cap for this host: learned settle time with headroom, never above max."""
+        learned = self._host_ema_ms.get(self._host_key(url))
+        if learned is None:
+            return self.max_wait_ms
+        return int(min(self.max_wait_ms, max(self.quiet_ms * 2, learned * 2)))
+
+    async def wait_until_ready(self, page, url: str) -> Dict[str, Any]:
+        budget_ms = self.budget_for(url)
+        started = time.perf_counter()
+        signal = "max_wait"
+
+        if budget_ms > 0:
+            dom_task = asyncio.ensure_future(
+                page.evaluate(
+                    DOM_QUIET_SCRIPT,
+                    {"quietMs": self.quiet_ms, "maxMs": budget_ms},
+                )
+            )
+            network_task = asyncio.ensure_future(
+                page.wait_for_load_state("networkidle", timeout=budget_ms)
+            )
+            deadline = started + budget_ms / 1000
+            await asyncio.wait({dom_task}, timeout=budget_ms / 1000)
+            if self._task_value(dom_task) == "dom_quiet" and not network_task.done():
+                # DOM has settled; give in-flight requests one quiet window at most.
+                grace = min(self.quiet_ms / 1000, deadline - time.perf_counter())
+                if grace > 0:
+                    await asyncio.wait({network_task}, timeout=grace)
+
+            done = {task for task in (dom_task, network_task) if task.done()}
+            pending = {dom_task, network_task} - done
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            dom_quiet = self._task_value(dom_task) == "dom_quiet"
+            network_idle = network_task in done and network_task.exception() is None
+            if dom_quiet and network_idle:
+                signal = "dom_and_network_quiet"
+            elif dom_quiet:
+                signal = "dom_quiet"
+            elif network_idle:
+                signal = "network_idle"
+
+        waited_ms = int((time.perf_counter() - started) * 1000)
+        self._record(url, waited_ms, signal)
+        return {
+            "render_wait_ms": waited_ms,
+            "render_ready_signal": signal,
+            "render_wait_budget_ms": budget_ms,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_wait_ms": self.max_wait_ms,
+            "quiet_ms": self.quiet_ms,
+            "tracked_hosts": len(self._host_ema_ms),
+            "waits_total": self._waits_total,
+            "wait_ms_avg": round(self._wait_ms_total / self._waits_total, 1)
+            if self._waits_total
+            else 0.0,
+            "signals": dict(self._signal_counts),
+        }
+
+    def _record(self, url: str, waited_ms: int, signal: str):
+        self._waits_total += 1
+        self._wait_ms_total += waited_ms
+        self._signal_counts[signal] = self._signal_counts.get(signal, 0) + 1
+
+        host = self._host_key(url)
+        if not host:
+            return
+
+        # Capped waits count as the full cap so hosts that never settle keep
+        # their whole budget instead of being cut short on the next visit.
+        previous = self._host_ema_ms.pop(host, None)
+        sample = float(waited_ms if signal != "max_wait" else self.max_wait_ms)
+        if previous is None:
+            current = sample
+        else:
+            current = previous + self.EMA_ALPHA * (sample - previous)
+        self._host_ema_ms[host] = current
+
+        while len(self._host_ema_ms) > self.MAX_TRACKED_HOSTS:
+            self._host_ema_ms.popitem(last=False)
+
+    @staticmethod
+    def _task_value(task: "asyncio.Future") -> Optional[Any]:
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        return (urlparse(url).netloc or "").lower()
+
+
+render_readiness_service = RenderReadinessService()
@@ -0,0 +1,248 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from ..config import (
+    ANALYSIS_BLOCK_TRACKERS,
+    ANALYSIS_BLOCKED_HOSTS,
+    ANALYSIS_BLOCKED_RESOURCE_TYPES,
+)
+from ..logger import setup_logger
+
+
+logger = setup_logger("api.services.request_policy")
+
+
+TRACKER_HOST_SUFFIXES = (
+    "google-analytics.com",
+    "analytics.google.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.com",
+    "segment.io",
+    "mixpanel.com",
+    "amplitude.com",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "adnxs.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "ads-twitter.com",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "wcs.naver.net",
+    "wcs.naver.com",
+    "t1.daumcdn.net",
+)
+
+
+@dataclass
+class AssetRecord:
+    url: str
+    resource_type: str
+    status: int = 0
+    content_type: str = ""
+    size_bytes: Optional[int] = None
+    transfer_bytes: Optional[int] = None
+    start_ms: Optional[float] = None
+    duration_ms: Optional[int] = None
+    blocked: bool = False
+    block_reason: Optional[str] = None
+    failed: bool = False
+
+
+class RequestPolicyService:
+    """Decides which subresources an analysis fetch may download."""
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = ANALYSIS_BLOCKED_RESOURCE_TYPES,
+        block_trackers: bool = ANALYSIS_BLOCK_TRACKERS,
+        extra_blocked_hosts: Iterable[str] = ANALYSIS_BLOCKED_HOSTS,
+    ):
+        self.blocked_resource_types = {
+            item.strip().lower() for item in blocked_resource_types if item.strip()
+        }
+        host_suffixes = list(TRACKER_HOST_SUFFIXES) if block_trackers else []
+        host_suffixes.extend(extra_blocked_hosts)
+        self.blocked_host_suffixes = tuple(
+            suffix.strip().lower().lstrip(".") for suffix in host_suffixes if suffix
+        )
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        if resource_type in self.blocked_resource_types:
+            return f"resource_type:{resource_type}"
+
+        host = (urlparse(url).hostname or "").lower()
+        for suffix in self.blocked_host_suffixes:
+            if host == suffix or host.endswith(f".{suffix}"):
+                return f"host:{suffix}"
+        return None
+
+    def new_recorder(self) -> "AssetRecorder":
+        return AssetRecorder(self)
+
+
+class AssetRecorder:
+    """Applies the policy to one browser context and records its network waterfall."""
+
+    DRAIN_TIMEOUT_SEC = 2.0
+
+    def __init__(self, policy: RequestPolicyService):
+        self.policy = policy
+        self.records: List[AssetRecord] = []
+        self._by_url: Dict[str, AssetRecord] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    async def attach(self, context):
+        await context.route("**/*", self._handle_route)
+        context.on("requestfinished", self._on_request_finished)
+        context.on("requestfailed", self._on_request_failed)
+
+    async def drain(self):
+        """Wait for in-flight size lookups so the waterfall is complete."""
+        if not self._pending:
+            return
+        await asyncio.wait(set(self._pending), timeout=self.DRAIN_TIMEOUT_SEC)
+
+    async def _handle_route(self, route):
+        request = route.request
+        reason = self.policy.block_reason(request.url, request.resource_type)
+        if reason is None:
+            await route.continue_()
+            return
+
+        self._remember(
+            AssetRecord(
+                url=request.url,
+                resource_type=request.resource_type,
+                blocked=True,
+                block_reason=reason,
+            )
+        )
+        await route.abort("blockedbyclient")
+
+    def _on_request_finished(self, request):
+        task = asyncio.ensure_future(self._record_finished(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _on_request_failed(self, request):
+        if request.url in self._by_url:
+            return
+        start_ms, duration_ms = self._timing(request)
+        self._remember(
+            AssetRecord(
+                url=request.url,
+                resource_type=request.resource_type,
+                start_ms=start_ms,
+                duration_ms=duration_ms,
+                failed=True,
+            )
+        )
+
+    async def _record_finished(self, request):
+        if request.resource_type == "document" and request.frame.parent_frame is None:
+            return
+
+        try:
+            response = await request.response()
+            sizes = await request.sizes()
+        except Exception as e:
+            logger.debug(f"Waterfall lookup failed for {request.url}: {e}")
+            return
+
+        headers = response.headers if response is not None else {}
+        body_size = sizes.get("responseBodySize", -1)
+        header_size = sizes.get("responseHeadersSize", -1)
+        if body_size < 0:
+            length = headers.get("content-length", "")
+            body_size = int(length) if length.isdigit() else -1
+
+        start_ms, duration_ms = self._timing(request)
+        self._remember(
+            AssetRecord(
+                url=request.url,
+                resource_type=request.resource_type,
+                status=response.status if response is not None else 0,
+                content_type=headers.get("content-type", "").lower(),
+                size_bytes=body_size if body_size >= 0 else None,
+                transfer_bytes=body_size + max(header_size, 0)
+                if body_size >= 0
+                else None,
+                start_ms=start_ms,
+                duration_ms=duration_ms,
+            )
+        )
+
+    @staticmethod
+    def _timing(request) -> Tuple[Optional[float], Optional[int]]:
+        timing = request.timing or {}
+        start = timing.get("startTime")
+        if not start or start < 0:
+            return None, None
+
+        response_end = timing.get("responseEnd", -1)
+        duration_ms = int(response_end) if response_end and response_end >= 0 else None
+        return start, duration_ms
+
+    def _remember(self, record: AssetRecord):
+        if record.url in self._by_url:
+            return
+        self._by_url[record.url] = record
+        self.records.append(record)
+
+    def inventory(self) -> List[Dict[str, Any]]:
+        """Records as dicts, with start_ms relative to the first request."""
+        starts = [record.start_ms for record in self.records if record.start_ms]
+        origin = min(starts) if starts else 0.0
+        rows = []
+        for record in self.records:
+            row = asdict(record)
+            if record.start_ms:
+                row["start_ms"] = int(record.start_ms - origin)
+            rows.append(row)
+        return rows
+
+    def summary(self) -> Dict[str, Any]:
+        blocked = [record for record in self.records if record.blocked]
+        loaded = [
+            record for record in self.records if not record.blocked and not record.failed
+        ]
+        by_type: Dict[str, Dict[str, int]] = {}
+        for record in loaded:
+            bucket = by_type.setdefault(record.resource_type, {"count": 0, "bytes": 0})
+            bucket["count"] += 1
+            bucket["bytes"] += record.transfer_bytes or record.size_bytes or 0
+
+        return {
+            "request_count": len(loaded),
+            "page_weight_bytes": sum(bucket["bytes"] for bucket in by_type.values()),
+            "by_type": by_type,
+            "failed_count": sum(1 for record in self.records if record.failed),
+            "blocked_count": len(blocked),
+            "blocked_hosts": sorted(
+                {
+                    record.block_reason.split(":", 1)[1]
+                    for record in blocked
+                    if record.block_reason and record.block_reason.startswith("host:")
+                }
+            ),
+        }
+
+
+request_policy_service = RequestPolicyService()
@@ -1,41 +1,226 @@
 import asyncio
+import itertools
 import json
+import os
+import socket
+import uuid
 import xml.etree.ElementTree as ET
-from typing import List, Optional, Tuple
+import zlib
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import aiohttp
-from sqlalchemy import func
+from sqlalchemy import and_, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 
 from .. import database, models
+from ..config import (
+    SITEMAP_BATCH_LEASE_SEC,
+    SITEMAP_BATCH_MAX_ATTEMPTS,
+    SITEMAP_BATCH_POLL_INTERVAL_SEC,
+    SITEMAP_BATCH_REAP_INTERVAL_SEC,
+    SITEMAP_BATCH_SKIP_CHECKS,
+    SITEMAP_FETCH_CONCURRENCY,
+)
 from ..logger import setup_logger
 from .analysis_service import AnalysisService
 from .blob_storage_service import BlobStorageService
+from .host_scheduler_service import host_scheduler_service
+from .http_session_service import http_session_service
 
 logger = setup_logger("api.services.sitemap_batch")
 
 
+@dataclass
+class SitemapEntry:
+    loc: str
+    lastmod: Optional[str] = None
+    is_sitemap: bool = False  # <sitemap> of a sitemap index rather than a page <url>
+
+
+class SitemapStreamParser:
+    """Incremental <urlset>/<sitemapindex> reader fed with raw body chunks.
+
+    gzip bodies (.xml.gz served without Content-Encoding) are inflated as they
+    arrive. Finished entries are cleared from the tree, so memory stays
+    bounded by the chunk size rather than the sitemap size.
+    """
+
+    GZIP_MAGIC = b"\x1f\x8b"
+    # The sitemap protocol caps files at 50 MB uncompressed
+    MAX_BYTES = 50 * 1024 * 1024
+
+    ENTRY_TAGS = {"urlset": "url", "sitemapindex": "sitemap"}
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._decompressor = None
+        self._head = b""
+        self._path: List[str] = []
+        self._root: Optional[ET.Element] = None
+        self._loc: Optional[str] = None
+        self._lastmod: Optional[str] = None
+        self.root_name: Optional[str] = None
+        self.bytes_read = 0
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[SitemapEntry]:
+        if self.done:
+            return []
+        if self._head is not None:
+            # Sniff gzip from the first two bytes, however the body is split
+            self._head += chunk
+            if len(self._head) < len(self.GZIP_MAGIC):
+                return []
+            chunk, self._head = self._head, None
+            if chunk.startswith(self.GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is not None:
+            try:
+                chunk = self._decompressor.decompress(
+                    chunk, self.MAX_BYTES - self.bytes_read + 1
+                )
+            except zlib.error:
+                self.done = True
+                return []
+
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.MAX_BYTES:
+            self.done = True
+            return []
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[SitemapEntry]:
+        if self._head:
+            chunk, self._head = self._head, b""
+            entries = self.feed(chunk)
+        else:
+            entries = []
+        if not self.done:
+            self.done = True
+            try:
+                self._parser.close()
+            except ET.ParseError:
+                pass
+            entries.extend(self._drain())
+        return entries
+
+    def _drain(self) -> List[SitemapEntry]:
+        entries: List[SitemapEntry] = []
+        try:
+            for event, element in self._parser.read_events():
+                name = self._local_name(element.tag)
+                if event == "start":
+                    if self._root is None:
+                        self._root = element
+                        self.root_name = name
+                    self._path.append(name)
+                    continue
+
+                entry_tag = self.ENTRY_TAGS.get(self.root_name)
+                parent = self._path[-2] if len(self._path) > 1 else None
+                if parent == entry_tag and len(self._path) == 3:
+                    text = (element.text or "").strip()
+                    if name == "loc":
+                        self._loc = text
+                    elif name == "lastmod":
+                        self._lastmod = text or None
+                elif name == entry_tag and len(self._path) == 2:
+                    if self._loc:
+                        entries.append(
+                            SitemapEntry(
+                                self._loc, self._lastmod, is_sitemap=name == "sitemap"
+                            )
+                        )
+                    self._loc = self._lastmod = None
+                    # Drop finished entries so the tree never grows
+                    self._root.clear()
+                self._path.pop()
+        except ET.ParseError:
+            # Keep what was read before the document broke off
+            self.done = True
+        return entries
+
+    @staticmethod
+    def _local_name(tag: str) -> str:
+        return tag.split("}", 1)[1] if "}" in tag else tag
+
+
 class SitemapBatchService:
+    """Sitemap batch jobs, queued durably in the sitemap_batch_items table.
+
+    A worker claims the oldest queued item by setting it to "processing"
+    under a lease (owner token and expiry) in one atomic UPDATE; Postgres
+    skips rows other replicas have locked, SQLite serializes writers. The
+    lease is renewed during the analysis. A reaper requeues items whose lease
+    expired (or fails them after SITEMAP_BATCH_MAX_ATTEMPTS claims), so items
+    left behind by a crash or deploy are picked up again. Discovery cut short
+    the same way is re-run, skipping the URLs already stored for the job.
+    """
+
+    # Rows per multi-row INSERT; workers can pick up a chunk as soon as it commits
+    INSERT_CHUNK_SIZE = 500
+
     def __init__(self):
-        self.queue: asyncio.Queue[Optional[int]] = asyncio.Queue(maxsize=10000)
         self.workers: List[asyncio.Task] = []
+        self.discoveries: Dict[int, asyncio.Task] = {}
         self.started = False
+        self.stopping = False
+        # Lease owners are "<host>:<pid>:<instance>:<claim>", so a restarted
+        # process can tell its predecessors' leases from live ones
+        self.host = socket.gethostname()
+        self.instance = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.discovery_owner = f"{self.instance}:discovery"
+        self._claims = itertools.count(1)
+        self._work_available: Optional[asyncio.Event] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+        self._claimed = 0
+        self._completed = 0
+        self._failed = 0
+        self._requeued = 0
+        self._expired_failed = 0
+        self._leases_lost = 0
 
     async def start_workers(self, worker_count: int = 2):
         if self.started:
             return
+        # A typo in the config fails startup instead of every batch item
+        AnalysisService.split_skip_checks(SITEMAP_BATCH_SKIP_CHECKS)
         self.started = True
+        self.stopping = False
+        self._work_available = asyncio.Event()
+
+        try:
+            self._recover(startup=True)
+        except Exception as e:
+            logger.error(f"Sitemap batch startup recovery failed: {e}")
+
         for _ in range(worker_count):
             self.workers.append(asyncio.create_task(self._worker_loop()))
+        self._reaper = asyncio.create_task(self._reaper_loop())
         logger.info(f"Started sitemap batch workers: {worker_count}")
 
     async def stop_workers(self):
         if not self.started:
             return
 
-        for _ in self.workers:
-            await self.queue.put(None)
+        for task in list(self.discoveries.values()):
+            task.cancel()
+        await asyncio.gather(*self.discoveries.values(), return_exceptions=True)
+
+        # Workers finish their current item; queued items stay in the table
+        self.stopping = True
+        self._notify_workers()
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
 
         await asyncio.gather(*self.workers, return_exceptions=True)
         self.workers.clear()
@@ -50,50 +235,272 @@ class SitemapBatchService:
         max_urls: int,
         include_aeo: bool,
     ) -> models.SitemapBatchJob:
-        urls = await self.parse_sitemap_urls(sitemap_url=sitemap_url, max_urls=max_urls)
-        if not urls:
-            raise ValueError("No URLs found in sitemap")
+        """Create the job and return at once; URLs are discovered in the background.
 
+        The job stays "discovering" while sitemaps are read. Each sitemap's
+        URLs are stored and queued as soon as it is parsed, so workers start on
+        the first pages while discovery continues.
+        """
         job = models.SitemapBatchJob(
             user_id=user.id,
             sitemap_url=sitemap_url,
             include_aeo=include_aeo,
-            status="queued",
-            total_urls=len(urls),
-            queued_urls=len(urls),
+            status="discovering",
+            total_urls=0,
+            queued_urls=0,
+            max_urls=max_urls,
+            discovery_owner=self.discovery_owner,
         )
         db.add(job)
         db.commit()
         db.refresh(job)
 
-        items: List[models.SitemapBatchItem] = []
-        for target_url in urls:
-            items.append(
-                models.SitemapBatchItem(
-                    job_id=job.id,
-                    user_id=user.id,
-                    target_url=target_url,
-                    status="queued",
+        self._start_discovery(job.id, user.id, sitemap_url, max_urls)
+        return job
+
+    def _start_discovery(
+        self,
+        job_id: int,
+        user_id: int,
+        sitemap_url: str,
+        max_urls: int,
+        resume: bool = False,
+    ):
+        task = asyncio.create_task(
+            self._discover(job_id, user_id, sitemap_url, max_urls, resume)
+        )
+        self.discoveries[job_id] = task
+        task.add_done_callback(lambda _: self.discoveries.pop(job_id, None))
+
+    async def _discover(
+        self,
+        job_id: int,
+        user_id: int,
+        sitemap_url: str,
+        max_urls: int,
+        resume: bool = False,
+    ):
+        error_message = None
+        heartbeat = asyncio.create_task(self._touch_discovery(job_id))
+        try:
+            # A resumed discovery walks the sitemaps again in the same order;
+            # URLs stored before the interruption are skipped, not re-queued.
+            known_urls = self._stored_urls(job_id) if resume else set()
+            batches = self.iter_sitemap_url_batches(sitemap_url, max_urls)
+            async with aclosing(batches):
+                async for urls in batches:
+                    urls = [url for url in urls if url not in known_urls]
+                    if urls:
+                        await self._add_items(job_id, user_id, urls)
+        except asyncio.CancelledError:
+            # Shutdown: leave the job discovering so the next start resumes it
+            self._release_discovery(job_id)
+            raise
+        except Exception as e:
+            logger.error(f"Sitemap discovery failed for job_id={job_id}: {e}")
+            error_message = f"Sitemap discovery failed: {e}"
+        finally:
+            heartbeat.cancel()
+        self._finish_discovery(job_id, error_message)
+
+    def _stored_urls(self, job_id: int) -> Set[str]:
+        items = models.SitemapBatchItem.__table__
+        db = database.SessionLocal()
+        try:
+            return set(
+                db.execute(
+                    select(items.c.target_url).where(items.c.job_id == job_id)
+                ).scalars()
+            )
+        finally:
+            db.close()
+
+    async def _touch_discovery(self, job_id: int):
+        # Keeps updated_at fresh while a slow sitemap yields no new chunk, so
+        # the reaper does not take over a discovery that is still running
+        jobs = models.SitemapBatchJob.__table__
+        while True:
+            await asyncio.sleep(max(1, SITEMAP_BATCH_LEASE_SEC // 3))
+            db = database.SessionLocal()
+            try:
+                db.execute(
+                    update(jobs)
+                    .where(
+                        jobs.c.id == job_id,
+                        jobs.c.discovery_owner == self.discovery_owner,
+                    )
+                    .values(updated_at=func.now())
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning(f"Discovery heartbeat failed for job_id={job_id}: {e}")
+            finally:
+                db.close()
+
+    def _release_discovery(self, job_id: int):
+        jobs = models.SitemapBatchJob.__table__
+        db = database.SessionLocal()
+        try:
+            db.execute(
+                update(jobs)
+                .where(
+                    jobs.c.id == job_id,
+                    jobs.c.discovery_owner == self.discovery_owner,
                 )
+                .values(discovery_owner=None)
             )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not release discovery for job_id={job_id}: {e}")
+        finally:
+            db.close()
 
-        db.add_all(items)
-        db.commit()
+    def _claim_discovery(
+        self, job_id: int, owner: Optional[str]
+    ) -> Optional[Tuple[int, str, Optional[int]]]:
+        """Take over an orphaned discovery: (user id, sitemap url, max urls), or None."""
+        jobs = models.SitemapBatchJob.__table__
+        owned_by = (
+            jobs.c.discovery_owner.is_(None)
+            if owner is None
+            else jobs.c.discovery_owner == owner
+        )
+        # Compare-and-set on the previous owner, so only one process wins
+        claim = (
+            update(jobs)
+            .where(jobs.c.id == job_id, jobs.c.status == "discovering", owned_by)
+            .values(discovery_owner=self.discovery_owner, updated_at=func.now())
+        )
+        columns = (jobs.c.user_id, jobs.c.sitemap_url, jobs.c.max_urls)
+        db = database.SessionLocal()
+        try:
+            if database.engine.dialect.update_returning:
+                row = db.execute(claim.returning(*columns)).first()
+            else:
+                row = None
+                if db.execute(claim).rowcount:
+                    row = db.execute(
+                        select(*columns).where(jobs.c.id == job_id)
+                    ).first()
+            db.commit()
+            return tuple(row) if row else None
+        finally:
+            db.close()
 
-        for item in items:
-            await self.queue.put(item.id)
+    async def _add_items(self, job_id: int, user_id: int, urls: List[str]) -> List[int]:
+        """Insert queued items in multi-row chunks and wake workers as each commits."""
+        item_ids: List[int] = []
+        for start in range(0, len(urls), self.INSERT_CHUNK_SIZE):
+            chunk = urls[start : start + self.INSERT_CHUNK_SIZE]
+            item_ids.extend(self._insert_items(job_id, user_id, chunk))
+            self._notify_workers()
+            # Let workers and requests run between chunks of a large sitemap
+            await asyncio.sleep(0)
+        return item_ids
 
-        return job
+    def _insert_items(self, job_id: int, user_id: int, urls: List[str]) -> List[int]:
+        items = models.SitemapBatchItem.__table__
+        rows = [
+            {
+                "job_id": job_id,
+                "user_id": user_id,
+                "target_url": target_url,
+                "status": "queued",
+                "attempts": 0,
+            }
+            for target_url in urls
+        ]
+        db = database.SessionLocal()
+        try:
+            if database.engine.dialect.insert_returning:
+                item_ids = list(
+                    db.execute(
+                        insert(items).returning(
+                            items.c.id, sort_by_parameter_order=True
+                        ),
+                        rows,
+                    ).scalars()
+                )
+            else:
+                # Only discovery inserts items of this job, so its new rows
+                # are the ones above the job's previous highest id.
+                last_id = db.execute(
+                    select(func.coalesce(func.max(items.c.id), 0)).where(
+                        items.c.job_id == job_id
+                    )
+                ).scalar()
+                db.execute(insert(items), rows)
+                item_ids = list(
+                    db.execute(
+                        select(items.c.id)
+                        .where(items.c.job_id == job_id, items.c.id > last_id)
+                        .order_by(items.c.id)
+                    ).scalars()
+                )
+
+            jobs = models.SitemapBatchJob.__table__
+            db.execute(
+                update(jobs)
+                .where(jobs.c.id == job_id)
+                .values(
+                    total_urls=func.coalesce(jobs.c.total_urls, 0) + len(rows),
+                    queued_urls=func.coalesce(jobs.c.queued_urls, 0) + len(rows),
+                )
+            )
+            db.commit()
+            return item_ids
+        finally:
+            db.close()
+
+    def _finish_discovery(self, job_id: int, error_message: Optional[str] = None):
+        db = database.SessionLocal()
+        try:
+            job = (
+                db.query(models.SitemapBatchJob)
+                .filter(models.SitemapBatchJob.id == job_id)
+                .first()
+            )
+            if not job:
+                return
+            if not job.total_urls:
+                job.status = "failed"
+                job.error_message = error_message or "No URLs found in sitemap"
+            else:
+                # Keep the URLs found so far; a partial discovery still runs
+                job.error_message = error_message
+                job.status = "queued"
+                self._refresh_job_progress(db, job)
+            job.discovery_owner = None
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to finish discovery for job_id={job_id}: {e}")
+        finally:
+            db.close()
 
     async def parse_sitemap_urls(self, sitemap_url: str, max_urls: int) -> List[str]:
+        urls: List[str] = []
+        batches = self.iter_sitemap_url_batches(sitemap_url, max_urls)
+        async with aclosing(batches):
+            async for batch in batches:
+                urls.extend(batch)
+        return urls
+
+    async def iter_sitemap_url_batches(
+        self, sitemap_url: str, max_urls: int
+    ) -> AsyncIterator[List[str]]:
+        """Yield the new page URLs of each sitemap, in discovery order, up to max_urls."""
         parsed = urlparse(sitemap_url)
         if not parsed.scheme:
             sitemap_url = f"https://{sitemap_url}"
             parsed = urlparse(sitemap_url)
 
         sitemap_sources = [sitemap_url]
-        if not parsed.path.endswith(".xml"):
-            discovered = await self._discover_from_robots(parsed)
+        # robots.txt is read even for direct sitemap URLs so its Crawl-delay
+        # applies to the sitemap fetches and the batch analyses that follow.
+        discovered = await self._discover_from_robots(parsed)
+        # Any explicit sitemap path (sitemap.xml, .xml.gz, /sitemap_index, ...)
+        # is read directly; only a bare site URL is resolved via robots.txt.
+        if parsed.path in ("", "/") and not parsed.query:
             if discovered:
                 sitemap_sources = discovered
             else:
@@ -101,51 +508,126 @@ class SitemapBatchService:
                     urljoin(f"{parsed.scheme}://{parsed.netloc}", "/sitemap.xml")
                 ]
 
-        timeout = aiohttp.ClientTimeout(total=30)
-        urls: List[str] = []
-        seen_urls = set()
-        pending: List[Tuple[str, int]] = [(source, 0) for source in sitemap_sources]
-        seen_sitemaps = set()
-
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            while pending and len(urls) < max_urls:
-                current_sitemap, depth = pending.pop(0)
-                if current_sitemap in seen_sitemaps or depth > 4:
-                    continue
+        timeout = http_session_service.timeout("sitemap")
+        found = 0
+        seen_urls: Set[str] = set()
+        seen_sitemaps: Set[str] = set()
+        level = list(dict.fromkeys(sitemap_sources))
+        depth = 0
 
-                seen_sitemaps.add(current_sitemap)
-                text = await self._fetch_text(session, current_sitemap)
-                if not text:
-                    continue
+        # Breadth first, one depth at a time: the sitemaps of a level are
+        # fetched concurrently but merged in document order, so the result is
+        # the same as walking them one by one.
+        async with http_session_service.session() as session:
+            while level and depth <= 4 and found < max_urls:
+                seen_sitemaps.update(level)
+                next_level: List[str] = []
+                results = self._read_sitemaps(
+                    session, level, timeout, max_urls - found, seen_urls
+                )
+                async with aclosing(results):
+                    async for page_urls, child_sitemaps in results:
+                        batch: List[str] = []
+                        for normalized in page_urls:
+                            if normalized not in seen_urls:
+                                seen_urls.add(normalized)
+                                batch.append(normalized)
+                                if found + len(batch) >= max_urls:
+                                    break
+                        if batch:
+                            found += len(batch)
+                            yield batch
+                        if found >= max_urls:
+                            # Cancels the fetches still running for this level
+                            break
+                        if depth < 4:
+                            next_level.extend(
+                                child
+                                for child in child_sitemaps
+                                if child not in seen_sitemaps
+                            )
 
-                page_urls, child_sitemaps = self._parse_sitemap_xml(text)
+                level = list(dict.fromkeys(next_level))
+                depth += 1
 
-                for page_url in page_urls:
-                    normalized = self._normalize_url(page_url)
-                    if normalized and normalized not in seen_urls:
-                        seen_urls.add(normalized)
-                        urls.append(normalized)
-                        if len(urls) >= max_urls:
-                            break
+    async def _read_sitemaps(
+        self,
+        session: aiohttp.ClientSession,
+        sitemap_urls: List[str],
+        timeout: aiohttp.ClientTimeout,
+        limit: int,
+        known_urls: Set[str],
+    ) -> AsyncIterator[Tuple[List[str], List[str]]]:
+        """Read sitemaps SITEMAP_FETCH_CONCURRENCY at a time; yield results in input order."""
+        # The semaphore wakes waiters in FIFO order, so fetches start in the
+        # order their results are consumed.
+        limiter = asyncio.Semaphore(max(1, SITEMAP_FETCH_CONCURRENCY))
 
-                if depth < 4:
-                    for child_sitemap in child_sitemaps:
-                        if child_sitemap not in seen_sitemaps:
-                            pending.append((child_sitemap, depth + 1))
+        async def read(sitemap_url: str) -> Tuple[List[str], List[str]]:
+            async with limiter:
+                return await self._read_sitemap(
+                    session, sitemap_url, timeout, limit, known_urls
+                )
 
-        return urls
+        tasks = [asyncio.ensure_future(read(sitemap_url)) for sitemap_url in sitemap_urls]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read_sitemap(
+        self,
+        session: aiohttp.ClientSession,
+        sitemap_url: str,
+        timeout: aiohttp.ClientTimeout,
+        limit: int,
+        known_urls: Set[str],
+    ) -> Tuple[List[str], List[str]]:
+        """(normalized page URLs, child sitemaps) of one sitemap.
+
+        Reading stops once `limit` URLs not already in `known_urls` are
+        collected; the job cannot take more than that from any one sitemap.
+        """
+        page_urls: List[str] = []
+        child_sitemaps: List[str] = []
+        local_seen: Set[str] = set()
+        entries = self.iter_sitemap_entries(session, sitemap_url, timeout)
+        async with aclosing(entries):
+            async for entry in entries:
+                if entry.is_sitemap:
+                    child_sitemaps.append(entry.loc)
+                    continue
+
+                normalized = self._normalize_url(entry.loc)
+                if not normalized or normalized in local_seen:
+                    continue
+                local_seen.add(normalized)
+                page_urls.append(normalized)
+                if normalized not in known_urls:
+                    limit -= 1
+                    if limit <= 0:
+                        # Stops reading the body mid-download
+                        break
+        return page_urls, child_sitemaps
 
     async def _discover_from_robots(self, parsed_url) -> List[str]:
         robots_url = urljoin(
             f"{parsed_url.scheme}://{parsed_url.netloc}", "/robots.txt"
         )
-        timeout = aiohttp.ClientTimeout(total=20)
+        timeout = http_session_service.timeout("robots")
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            text = await self._fetch_text(session, robots_url)
+        async with http_session_service.session() as session:
+            text = await self._fetch_text(session, robots_url, timeout)
             if not text:
                 return []
 
+        crawl_delay = host_scheduler_service.parse_crawl_delay(text)
+        if crawl_delay is not None:
+            host_scheduler_service.set_crawl_delay(robots_url, crawl_delay)
+
         sitemap_urls: List[str] = []
         for line in text.splitlines():
             stripped = line.strip()
@@ -155,45 +637,45 @@ class SitemapBatchService:
                     sitemap_urls.append(sitemap_candidate)
         return sitemap_urls
 
-    async def _fetch_text(self, session: aiohttp.ClientSession, url: str) -> str:
+    async def _fetch_text(
+        self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout
+    ) -> str:
         try:
-            async with session.get(url, allow_redirects=True) as response:
+            async with host_scheduler_service.slot(url), session.get(
+                url, allow_redirects=True, timeout=timeout
+            ) as response:
+                host_scheduler_service.record_response(
+                    url, response.status, response.headers.get("Retry-After")
+                )
                 if response.status >= 400:
                     return ""
                 return await response.text()
         except Exception:
             return ""
 
-    def _parse_sitemap_xml(self, xml_text: str) -> Tuple[List[str], List[str]]:
+    async def iter_sitemap_entries(
+        self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout
+    ) -> AsyncIterator[SitemapEntry]:
+        """Yield a sitemap's entries while its body downloads; close early to stop reading."""
+        parser = SitemapStreamParser()
         try:
-            root = ET.fromstring(xml_text)
-        except ET.ParseError:
-            return [], []
-
-        def local_name(tag: str) -> str:
-            return tag.split("}", 1)[1] if "}" in tag else tag
-
-        root_name = local_name(root.tag)
-        page_urls: List[str] = []
-        child_sitemaps: List[str] = []
-
-        if root_name == "urlset":
-            for url_node in root:
-                if local_name(url_node.tag) != "url":
-                    continue
-                for child in url_node:
-                    if local_name(child.tag) == "loc" and child.text:
-                        page_urls.append(child.text.strip())
-
-        if root_name == "sitemapindex":
-            for sitemap_node in root:
-                if local_name(sitemap_node.tag) != "sitemap":
-                    continue
-                for child in sitemap_node:
-                    if local_name(child.tag) == "loc" and child.text:
-                        child_sitemaps.append(child.text.strip())
-
-        return page_urls, child_sitemaps
+            async with host_scheduler_service.slot(url), session.get(
+                url, allow_redirects=True, timeout=timeout
+            ) as response:
+                host_scheduler_service.record_response(
+                    url, response.status, response.headers.get("Retry-After")
+                )
+                if response.status >= 400:
+                    return
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    for entry in parser.feed(chunk):
+                        yield entry
+                    if parser.done:
+                        break
+                for entry in parser.close():
+                    yield entry
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Sitemap fetch failed for {url}: {e}")
 
     def _normalize_url(self, url: str) -> str:
         parsed = urlparse(url.strip())
@@ -212,48 +694,115 @@ class SitemapBatchService:
             )
         )
 
-    async def _worker_loop(self):
-        while True:
-            item_id = await self.queue.get()
-            if item_id is None:
-                self.queue.task_done()
-                break
+    def _notify_workers(self):
+        if self._work_available is not None:
+            self._work_available.set()
 
-            db = database.SessionLocal()
+    def _lease_deadline(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=SITEMAP_BATCH_LEASE_SEC)
+
+    async def _worker_loop(self):
+        while not self.stopping:
+            # Cleared before claiming, so an insert after a miss still wakes us
+            self._work_available.clear()
             try:
-                item = (
-                    db.query(models.SitemapBatchItem)
-                    .filter(models.SitemapBatchItem.id == item_id)
-                    .first()
-                )
-                if not item:
-                    self.queue.task_done()
-                    continue
+                claim = self._claim_next_item()
+            except Exception as e:
+                logger.error(f"Batch worker could not claim an item: {e}")
+                claim = None
 
-                job = (
-                    db.query(models.SitemapBatchJob)
-                    .filter(models.SitemapBatchJob.id == item.job_id)
-                    .first()
-                )
-                if not job:
-                    self.queue.task_done()
-                    continue
+            if claim is None:
+                try:
+                    await asyncio.wait_for(
+                        self._work_available.wait(), SITEMAP_BATCH_POLL_INTERVAL_SEC
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
 
-                if item.status in {"completed", "failed"}:
-                    self.queue.task_done()
-                    continue
+            await self._process_item(*claim)
+
+    def _claim_next_item(self) -> Optional[Tuple[int, str]]:
+        """Lease the oldest queued item: (item id, lease owner), or None if idle."""
+        items = models.SitemapBatchItem.__table__
+        lease_owner = f"{self.instance}:{next(self._claims)}"
+        next_item = (
+            select(items.c.id)
+            .where(items.c.status == "queued")
+            .order_by(items.c.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)  # not rendered on SQLite
+        )
+        lease = {
+            "status": "processing",
+            "attempts": func.coalesce(items.c.attempts, 0) + 1,
+            "lease_owner": lease_owner,
+            "lease_expires_at": self._lease_deadline(),
+        }
+        db = database.SessionLocal()
+        try:
+            if database.engine.dialect.update_returning:
+                item_id = db.execute(
+                    update(items)
+                    .where(
+                        items.c.id == next_item.scalar_subquery(),
+                        items.c.status == "queued",
+                    )
+                    .values(**lease)
+                    .returning(items.c.id)
+                ).scalar()
+            else:
+                # Pick, then compare-and-set on the status; losing the race
+                # to another worker wakes this one to try again at once.
+                item_id = db.execute(next_item).scalar()
+                if item_id is not None and not db.execute(
+                    update(items)
+                    .where(items.c.id == item_id, items.c.status == "queued")
+                    .values(**lease)
+                ).rowcount:
+                    item_id = None
+                    self._notify_workers()
+            db.commit()
+        finally:
+            db.close()
+
+        if item_id is None:
+            return None
+        self._claimed += 1
+        return item_id, lease_owner
 
-                item.status = "processing"
-                item.attempts = (item.attempts or 0) + 1
+    async def _process_item(self, item_id: int, lease_owner: str):
+        items = models.SitemapBatchItem.__table__
+        renewal = asyncio.create_task(self._renew_lease(item_id, lease_owner))
+        db = database.SessionLocal()
+        try:
+            item = (
+                db.query(models.SitemapBatchItem)
+                .filter(models.SitemapBatchItem.id == item_id)
+                .first()
+            )
+            if not item:
+                # Deleted (with its job) while the lease was held
+                return
+            job = (
+                db.query(models.SitemapBatchJob)
+                .filter(models.SitemapBatchJob.id == item.job_id)
+                .first()
+            )
+            if not job:
+                values = {"status": "failed", "error_message": "Batch job not found"}
+            else:
                 if job.status == "queued":
                     job.status = "processing"
-                db.commit()
+                    db.commit()
 
                 try:
                     result = await AnalysisService.analyze_url(
                         url=item.target_url,
                         include_aeo=bool(job.include_aeo),
                         include_pagespeed=False,
+                        skip_checks=SITEMAP_BATCH_SKIP_CHECKS,
+                        offload_cpu=True,
                     )
                     blob_meta = BlobStorageService.save_json_blob(
                         namespace="sitemap_batch_item",
@@ -264,51 +813,269 @@ class SitemapBatchService:
                             "result": result,
                         },
                     )
-                    item.status = "completed"
-                    item.error_message = None
-                    item.report_json = json.dumps(
-                        {
-                            "storage_policy": "full_result_blob_with_db_summary",
-                            "blob_meta": blob_meta,
-                            "seo_score": (result.get("seo_result") or {}).get(
-                                "score", 0
-                            ),
-                        },
-                        default=str,
-                    )
+                    values = {
+                        "status": "completed",
+                        "error_message": None,
+                        "report_json": json.dumps(
+                            {
+                                "storage_policy": "full_result_blob_with_db_summary",
+                                "blob_meta": blob_meta,
+                                "seo_score": (result.get("seo_result") or {}).get(
+                                    "score", 0
+                                ),
+                            },
+                            default=str,
+                        ),
+                    }
                 except Exception as e:
-                    item.status = "failed"
-                    item.error_message = str(e)
+                    values = {"status": "failed", "error_message": str(e)}
 
-                status_counts = dict(
-                    db.query(
-                        models.SitemapBatchItem.status,
-                        func.count(models.SitemapBatchItem.id),
-                    )
-                    .filter(models.SitemapBatchItem.job_id == job.id)
-                    .group_by(models.SitemapBatchItem.status)
-                    .all()
-                )
-
-                completed = int(status_counts.get("completed", 0))
-                failed = int(status_counts.get("failed", 0))
-                queued = int(status_counts.get("queued", 0))
-
-                job.completed_urls = completed
-                job.failed_urls = failed
-                job.queued_urls = queued
+            renewal.cancel()
+            # Only the lease holder may finish the item; after an expiry the
+            # reaper may already have handed it to another worker.
+            finished = db.execute(
+                update(items)
+                .where(items.c.id == item_id, items.c.lease_owner == lease_owner)
+                .values(lease_owner=None, lease_expires_at=None, **values)
+            )
+            if not finished.rowcount:
+                db.rollback()
+                self._leases_lost += 1
+                logger.warning(f"Lease lost for batch item_id={item_id}; result dropped")
+                return
 
-                if completed + failed >= job.total_urls:
-                    job.status = "completed" if failed == 0 else "failed"
-                else:
-                    job.status = "processing"
+            if values["status"] == "completed":
+                self._completed += 1
+            else:
+                self._failed += 1
+            if job:
+                # Discovery may have added items or finished during the analysis
+                db.refresh(job)
+                self._refresh_job_progress(db, job)
+            db.commit()
+        except asyncio.CancelledError:
+            db.rollback()
+            self._release_lease(item_id, lease_owner)
+            raise
+        except Exception as e:
+            logger.error(f"Batch worker failed for item_id={item_id}: {e}")
+        finally:
+            renewal.cancel()
+            db.close()
 
+    async def _renew_lease(self, item_id: int, lease_owner: str):
+        items = models.SitemapBatchItem.__table__
+        while True:
+            await asyncio.sleep(max(1, SITEMAP_BATCH_LEASE_SEC // 3))
+            db = database.SessionLocal()
+            try:
+                db.execute(
+                    update(items)
+                    .where(items.c.id == item_id, items.c.lease_owner == lease_owner)
+                    .values(lease_expires_at=self._lease_deadline())
+                )
                 db.commit()
             except Exception as e:
-                logger.error(f"Batch worker failed for item_id={item_id}: {e}")
+                logger.warning(f"Lease renewal failed for item_id={item_id}: {e}")
             finally:
                 db.close()
-                self.queue.task_done()
+
+    def _release_lease(self, item_id: int, lease_owner: str):
+        items = models.SitemapBatchItem.__table__
+        db = database.SessionLocal()
+        try:
+            db.execute(
+                update(items)
+                .where(items.c.id == item_id, items.c.lease_owner == lease_owner)
+                .values(
+                    status="queued",
+                    attempts=func.coalesce(items.c.attempts, 1) - 1,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                )
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not release lease for item_id={item_id}: {e}")
+        finally:
+            db.close()
+
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(max(1, SITEMAP_BATCH_REAP_INTERVAL_SEC))
+            try:
+                self._recover()
+            except Exception as e:
+                logger.error(f"Sitemap batch reaper failed: {e}")
+
+    def _recover(self, startup: bool = False):
+        """Requeue or fail items with expired leases and resume stale discoveries.
+
+        At startup, leases and discoveries held by an earlier process on this
+        host are recovered at once instead of waiting for them to expire.
+        """
+        items = models.SitemapBatchItem.__table__
+        jobs = models.SitemapBatchJob.__table__
+        now = datetime.now(timezone.utc)
+        abandoned = or_(
+            items.c.lease_expires_at.is_(None), items.c.lease_expires_at < now
+        )
+        if startup:
+            dead_owners = self._dead_owners(
+                items.c.lease_owner, items.c.status == "processing"
+            )
+            if dead_owners:
+                abandoned = or_(abandoned, items.c.lease_owner.in_(dead_owners))
+        abandoned = and_(items.c.status == "processing", abandoned)
+
+        db = database.SessionLocal()
+        try:
+            job_ids = set(
+                db.execute(select(items.c.job_id).where(abandoned).distinct()).scalars()
+            )
+            if job_ids:
+                expired_failed = db.execute(
+                    update(items)
+                    .where(
+                        abandoned,
+                        func.coalesce(items.c.attempts, 0) >= SITEMAP_BATCH_MAX_ATTEMPTS,
+                    )
+                    .values(
+                        status="failed",
+                        error_message=(
+                            f"Abandoned after {SITEMAP_BATCH_MAX_ATTEMPTS} attempts"
+                        ),
+                        lease_owner=None,
+                        lease_expires_at=None,
+                    )
+                ).rowcount
+                requeued = db.execute(
+                    update(items)
+                    .where(abandoned)
+                    .values(status="queued", lease_owner=None, lease_expires_at=None)
+                ).rowcount
+                for job in db.query(models.SitemapBatchJob).filter(
+                    models.SitemapBatchJob.id.in_(job_ids)
+                ):
+                    self._refresh_job_progress(db, job)
+                db.commit()
+
+                self._requeued += requeued
+                self._expired_failed += expired_failed
+                logger.info(
+                    f"Recovered sitemap batch items: requeued={requeued} "
+                    f"failed={expired_failed}"
+                )
+                if requeued:
+                    self._notify_workers()
+
+            # A running discovery touches its job at least every third of a
+            # lease period; one released at shutdown has no owner at all.
+            stale = now - timedelta(seconds=SITEMAP_BATCH_LEASE_SEC)
+            orphaned_criteria = [
+                jobs.c.discovery_owner.is_(None),
+                jobs.c.updated_at < stale,
+            ]
+            if startup:
+                dead_owners = self._dead_owners(
+                    jobs.c.discovery_owner, jobs.c.status == "discovering"
+                )
+                if dead_owners:
+                    orphaned_criteria.append(jobs.c.discovery_owner.in_(dead_owners))
+            orphaned = [
+                (job_id, owner)
+                for job_id, owner in db.execute(
+                    select(jobs.c.id, jobs.c.discovery_owner).where(
+                        jobs.c.status == "discovering", or_(*orphaned_criteria)
+                    )
+                )
+                if job_id not in self.discoveries
+            ]
+        finally:
+            db.close()
+
+        for job_id, owner in orphaned:
+            claim = self._claim_discovery(job_id, owner)
+            if claim is None:
+                continue
+            user_id, sitemap_url, max_urls = claim
+            if not max_urls:
+                # Jobs created before max_urls was stored cannot be resumed
+                self._finish_discovery(job_id, "Sitemap discovery interrupted")
+                continue
+            logger.info(f"Resuming sitemap discovery for job_id={job_id}")
+            self._start_discovery(job_id, user_id, sitemap_url, max_urls, resume=True)
+
+    def _dead_owners(self, owner_column, *criteria) -> List[str]:
+        db = database.SessionLocal()
+        try:
+            owners = db.execute(
+                select(owner_column)
+                .where(owner_column.like(f"{self.host}:%"), *criteria)
+                .distinct()
+            ).scalars()
+            return [owner for owner in owners if self._owner_is_dead(owner)]
+        finally:
+            db.close()
+
+    def _owner_is_dead(self, lease_owner: str) -> bool:
+        parts = lease_owner.split(":")
+        if len(parts) < 4 or not parts[1].isdigit():
+            return False
+        if f"{parts[0]}:{parts[1]}:{parts[2]}" == self.instance:
+            return False
+        pid = int(parts[1])
+        if pid == os.getpid():
+            # Same pid under a new instance: a restarted container
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False
+        return False
+
+    def _refresh_job_progress(self, db: Session, job: models.SitemapBatchJob):
+        # Sessions do not autoflush; count the caller's item changes too
+        db.flush()
+        status_counts = dict(
+            db.query(
+                models.SitemapBatchItem.status,
+                func.count(models.SitemapBatchItem.id),
+            )
+            .filter(models.SitemapBatchItem.job_id == job.id)
+            .group_by(models.SitemapBatchItem.status)
+            .all()
+        )
+
+        completed = int(status_counts.get("completed", 0))
+        failed = int(status_counts.get("failed", 0))
+        queued = int(status_counts.get("queued", 0))
+
+        job.completed_urls = completed
+        job.failed_urls = failed
+        job.queued_urls = queued
+
+        if job.status == "discovering":
+            # The job cannot finish before every URL is known
+            return
+        if completed + failed >= job.total_urls:
+            job.status = "completed" if failed == 0 else "failed"
+        elif completed + failed or status_counts.get("processing"):
+            job.status = "processing"
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self.workers),
+            "discoveries": len(self.discoveries),
+            "claimed": self._claimed,
+            "completed": self._completed,
+            "failed": self._failed,
+            "requeued": self._requeued,
+            "expired_failed": self._expired_failed,
+            "leases_lost": self._leases_lost,
+        }
 
 
 sitemap_batch_service = SitemapBatchService()
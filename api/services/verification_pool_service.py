@@ -0,0 +1,190 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Sequence
+
+from ..config import VERIFY_POOL_ENABLED, VERIFY_POOL_WORKERS
+from ..logger import setup_logger
+
+# Root modules; spawned workers inherit the parent's sys.path.
+from aeo_verifier import AEO_CHECKS, AeoVerifier
+from html_document import DocumentIndex
+from seo_verifier import SEO_CHECKS, SeoVerifier
+
+logger = setup_logger("api.services.verification_pool")
+
+
+def _read_shared_html(shm_name: str, size: int) -> str:
+    # Spawned workers share the parent's resource tracker, so attaching here
+    # does not take ownership; the parent unlinks the segment.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf[:size]
+        try:
+            return str(view, "utf-8", "replace")
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def verify_shared_html(
+    shm_name: str,
+    size: int,
+    url: str,
+    include_aeo: bool,
+    skip_checks: Sequence[str],
+) -> Dict[str, Any]:
+    """Worker entry point: parse and run every cpu check on HTML in shared memory.
+
+    Network checks are left to the caller, which gets the compact image list
+    they need instead of the parse tree.
+    """
+    started = time.perf_counter()
+    html = _read_shared_html(shm_name, size)
+    document = DocumentIndex.from_html(html)
+    del html
+
+    seo = SeoVerifier("", url, document=document)
+    seo_skip = [name for name in skip_checks if name in SEO_CHECKS.names or name in SEO_CHECKS.costs]
+    seo_results, seo_meta = SEO_CHECKS.run_sync(seo, skip=seo_skip + ["network"])
+    seo_meta["parse_ms"] = document.parse_ms
+    seo_meta["truncated"] = document.truncated
+
+    aeo_results = None
+    if include_aeo:
+        aeo = AeoVerifier(document=document)
+        aeo_skip = [name for name in skip_checks if name in AEO_CHECKS.names or name in AEO_CHECKS.costs]
+        aeo_results = aeo.analyze(skip=aeo_skip)
+
+    return {
+        "seo_results": seo_results,
+        "seo_meta": seo_meta,
+        "aeo_results": aeo_results,
+        "images": [
+            {"src": image.get("src"), "alt": image.get("alt")}
+            for image in document.images
+        ],
+        "worker_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+class VerificationPoolService:
+    """Process pool that runs the cpu-bound parse and check phase off the event loop."""
+
+    def __init__(
+        self, workers: int = VERIFY_POOL_WORKERS, enabled: bool = VERIFY_POOL_ENABLED
+    ):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self._tasks_total = 0
+        self._in_flight = 0
+        self._failures = 0
+        self._restarts = 0
+        self._worker_ms_total = 0.0
+        self._bytes_total = 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        if not self.enabled or self._executor is not None:
+            return
+        # spawn keeps workers clear of the parent's event loop and browser threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Verification process pool started: {self.workers} workers")
+
+    def stop(self):
+        executor = self._executor
+        self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("Verification process pool stopped")
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor, once however many of its calls fail."""
+        if self._executor is not broken:
+            return  # another failing call already restarted it
+        self._executor = None
+        # Its workers are dead; waiting would only block the event loop
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._restarts += 1
+        logger.error("Verification pool broke; restarting it")
+        self.start()
+
+    async def verify(
+        self,
+        html: str,
+        url: str,
+        include_aeo: bool,
+        skip_checks: Sequence[str] = (),
+    ) -> Dict[str, Any]:
+        """Run verify_shared_html in the pool; the HTML crosses over via shared memory."""
+        if self._executor is None:
+            raise RuntimeError("Verification pool is not started")
+
+        payload = html.encode("utf-8", errors="replace")
+        size = len(payload)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        self._in_flight += 1
+        try:
+            shm.buf[:size] = payload
+            del payload
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._executor
+                if executor is None:
+                    raise RuntimeError("Verification pool is not started")
+                try:
+                    result = await loop.run_in_executor(
+                        executor,
+                        verify_shared_html,
+                        shm.name,
+                        size,
+                        url,
+                        include_aeo,
+                        list(skip_checks),
+                    )
+                    break
+                except BrokenProcessPool:
+                    self._failures += 1
+                    if attempt:
+                        raise
+                    # Retried once on the replacement pool
+                    self._restart(executor)
+        finally:
+            self._in_flight -= 1
+            shm.close()
+            shm.unlink()
+
+        self._tasks_total += 1
+        self._bytes_total += size
+        self._worker_ms_total += result.get("worker_ms", 0.0)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "tasks_total": self._tasks_total,
+            "failures": self._failures,
+            "restarts": self._restarts,
+            "bytes_total": self._bytes_total,
+            "worker_ms_avg": round(self._worker_ms_total / self._tasks_total, 1)
+            if self._tasks_total
+            else 0.0,
+        }
+
+
+verification_pool_service = VerificationPoolService()
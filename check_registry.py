@@ -0,0 +1,167 @@
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+
+
+PASS_STATUS = '✅ Pass'
+FAIL_STATUS = '❌ Fail'
+
+
+@dataclass
+class Check:
+    name: str
+    func: object
+    inputs: tuple = ()          # DocumentIndex fields (or other state) the check reads
+    cost: str = 'cpu'           # 'cpu' runs inline, 'network' overlaps with the cpu checks
+    weight: int = 0             # score deduction when the check does not pass
+    penalize: str = 'not_pass'  # 'not_pass' or 'fail' (only an explicit ❌ Fail deducts)
+    is_async: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self.is_async = inspect.iscoroutinefunction(self.func)
+
+    def deducts(self, result):
+        status = result.get('status') if isinstance(result, dict) else None
+        if self.penalize == 'fail':
+            return status == FAIL_STATUS
+        return status != PASS_STATUS
+
+
+class CheckRegistry:
+    """Ordered set of verifier checks with declared inputs, cost and score weight.
+
+    Checks are registered with the decorator on verifier methods and run in
+    registration order; `only`/`skip` accept check names or cost labels.
+    """
+
+    def __init__(self):
+        self._checks = {}
+
+    def register(self, name, inputs=(), cost='cpu', weight=0, penalize='not_pass'):
+        def decorator(func):
+            if name in self._checks:
+                raise ValueError(f"Check '{name}' is already registered")
+            self._checks[name] = Check(name, func, tuple(inputs), cost, weight, penalize)
+            return func
+        return decorator
+
+    @property
+    def names(self):
+        return list(self._checks)
+
+    @property
+    def costs(self):
+        return {check.cost for check in self._checks.values()}
+
+    def describe(self):
+        return [
+            {'name': c.name, 'inputs': list(c.inputs), 'cost': c.cost, 'weight': c.weight}
+            for c in self._checks.values()
+        ]
+
+    def select(self, only=None, skip=None):
+        only = set(only or ())
+        skip = set(skip or ())
+        known = set(self._checks) | self.costs
+        unknown = (only | skip) - known
+        if unknown:
+            raise ValueError(f"Unknown checks: {', '.join(sorted(unknown))}")
+
+        selected = []
+        for check in self._checks.values():
+            if only and check.name not in only and check.cost not in only:
+                continue
+            if check.name in skip or check.cost in skip:
+                continue
+            selected.append(check)
+        return selected
+
+    async def run(self, target, only=None, skip=None):
+        """Run the selected checks; returns (results, meta) with per-check wall time."""
+        selected = self.select(only, skip)
+        started = time.perf_counter()
+        timings = {}
+        results = {}
+
+        async def timed(check):
+            check_started = time.perf_counter()
+            try:
+                return await check.func(target)
+            finally:
+                timings[check.name] = self._elapsed_ms(check_started)
+
+        # Network-bound checks start first so their I/O overlaps the cpu checks.
+        tasks = {
+            check.name: asyncio.ensure_future(timed(check))
+            for check in selected
+            if check.is_async
+        }
+        try:
+            for check in selected:
+                if check.is_async:
+                    continue
+                check_started = time.perf_counter()
+                results[check.name] = check.func(target)
+                timings[check.name] = self._elapsed_ms(check_started)
+                if tasks:
+                    await asyncio.sleep(0)
+            for name, task in tasks.items():
+                results[name] = await task
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+        return self._ordered(selected, results), self._meta(selected, timings, started)
+
+    def run_sync(self, target, only=None, skip=None):
+        selected = self.select(only, skip)
+        async_checks = [check.name for check in selected if check.is_async]
+        if async_checks:
+            raise ValueError(f"Async checks need run(): {', '.join(async_checks)}")
+
+        started = time.perf_counter()
+        timings = {}
+        results = {}
+        for check in selected:
+            check_started = time.perf_counter()
+            results[check.name] = check.func(target)
+            timings[check.name] = self._elapsed_ms(check_started)
+        return self._ordered(selected, results), self._meta(selected, timings, started)
+
+    def score(self, results, base=100):
+        """Deduct the weight of every evaluated check that did not pass.
+
+        Deductions are scaled by total weight / evaluated weight, so a run with
+        skipped checks is scored on what it evaluated; a full run is unchanged.
+        """
+        total = sum(check.weight for check in self._checks.values())
+        evaluated = 0
+        deducted = 0
+        for name, result in results.items():
+            check = self._checks.get(name)
+            if check is None or not check.weight:
+                continue
+            evaluated += check.weight
+            if check.deducts(result):
+                deducted += check.weight
+        if not evaluated:
+            return base
+        return max(0, round(base - deducted * total / evaluated))
+
+    def _meta(self, selected, timings, started):
+        selected_names = {check.name for check in selected}
+        return {
+            'timings_ms': {check.name: timings.get(check.name, 0.0) for check in selected},
+            'total_ms': self._elapsed_ms(started),
+            'skipped': [name for name in self._checks if name not in selected_names],
+        }
+
+    @staticmethod
+    def _ordered(selected, results):
+        return {check.name: results[check.name] for check in selected}
+
+    @staticmethod
+    def _elapsed_ms(started):
+        return round((time.perf_counter() - started) * 1000, 2)
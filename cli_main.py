@@ -91,6 +91,7 @@ async def run_seo_analysis(target_url):
     try:
         from seo_verifier import SeoVerifier
         from aeo_verifier import AeoVerifier
+        from html_document import DocumentIndex
         from api_manager import ApiManager
         from pagespeed_checker import PageSpeedChecker
         
@@ -103,11 +104,12 @@ async def run_seo_analysis(target_url):
         print(f"👤 User Tier: {user_tier} (Single Analysis Mode)")
         
         # 1. SEO Analysis (Async)
-        seo_verifier = SeoVerifier(html_content, target_url)
+        document = DocumentIndex.from_html(html_content)
+        seo_verifier = SeoVerifier(html_content, target_url, document=document)
         automated_seo_report = await seo_verifier.get_summary_markdown_async()
         
         # 2. AEO Analysis
-        aeo_verifier = AeoVerifier(html_content)
+        aeo_verifier = AeoVerifier(document=document)
         automated_aeo_report = aeo_verifier.get_summary_markdown()
 
         # 3. PageSpeed Analysis (Async)
@@ -0,0 +1,555 @@
+import codecs
+import logging
+import os
+import time
+from html.parser import HTMLParser
+from importlib import import_module
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from structured_data import StructuredData
+
+
+logger = logging.getLogger(__name__)
+
+# auto | selectolax | lxml | html.parser. selectolax and lxml close elements
+# the HTML5 way (an unclosed <p> ends at the next <p>, a <p> ends an open <h3>),
+# so title/p/heading text can differ from html.parser; they are opt-in.
+HTML_PARSER_BACKEND = os.getenv('HTML_PARSER_BACKEND', 'html.parser').strip().lower()
+BACKEND_PREFERENCE = ('selectolax', 'lxml', 'html.parser')
+# Documents are cut (at a tag boundary) beyond this many UTF-8 bytes; 0 = no limit
+HTML_MAX_BYTES = int(os.getenv('HTML_MAX_BYTES', str(10 * 1024 * 1024)))
+# Longer documents are indexed by the streaming builder instead of a parse tree
+HTML_STREAM_MIN_CHARS = int(os.getenv('HTML_STREAM_MIN_CHARS', str(2 * 1024 * 1024)))
+STREAM_CHUNK_CHARS = 64 * 1024
+
+JSON_LD_TYPE = 'application/ld+json'
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+# Strings inside these never count as page text (BeautifulSoup's string containers)
+NON_TEXT_CONTAINERS = {'script', 'style', 'template', 'rt', 'rp'}
+# Comments and PIs only come as their own events; their tails are page text
+LXML_WALK_EVENTS = ('start', 'end', 'comment', 'pi')
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+
+
+def _module_available(name):
+    try:
+        import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+def available_backends():
+    available = []
+    if _module_available('selectolax.lexbor'):
+        available.append('selectolax')
+    if _module_available('lxml.html'):
+        available.append('lxml')
+    available.append('html.parser')
+    return available
+
+
+def resolve_backend(name=None):
+    """Backend to use for `name` (default: HTML_PARSER_BACKEND), falling back to html.parser."""
+    requested = (name or HTML_PARSER_BACKEND or 'auto').lower()
+    available = available_backends()
+    if requested == 'auto':
+        return available[0]
+    if requested in available:
+        return requested
+    if requested not in BACKEND_PREFERENCE:
+        logger.warning(f"Unknown HTML parser backend '{requested}', using html.parser")
+    else:
+        logger.warning(f"HTML parser backend '{requested}' is not installed, using html.parser")
+    return 'html.parser'
+
+
+def truncate_html(html_content, max_bytes=None):
+    """(html, truncated): html cut to max_bytes (default HTML_MAX_BYTES) of UTF-8.
+
+    The cut lands before the last '<' in range, so no tag is left half-open.
+    """
+    max_bytes = HTML_MAX_BYTES if max_bytes is None else max_bytes
+    # A character is at most 4 bytes, so short documents skip the encode
+    if not max_bytes or len(html_content) * 4 <= max_bytes:
+        return html_content, False
+    encoded = html_content.encode('utf-8', errors='replace')
+    if len(encoded) <= max_bytes:
+        return html_content, False
+    kept = encoded[:max_bytes].decode('utf-8', errors='ignore')
+    boundary = kept.rfind('<')
+    return (kept[:boundary] if boundary >= 0 else kept), True
+
+
+def iter_chunks(html_content, size=STREAM_CHUNK_CHARS):
+    for start in range(0, len(html_content), size):
+        yield html_content[start:start + size]
+
+
+def _normalize_attrs(attrs):
+    """Attribute dict shaped like BeautifulSoup's: '' for bare attributes, rel as a list."""
+    normalized = {key: '' if value is None else value for key, value in attrs.items()}
+    rel = normalized.get('rel')
+    if isinstance(rel, str):
+        normalized['rel'] = rel.split()
+    return normalized
+
+
+class DocumentIndex:
+    """Everything the verifiers read from a page, collected in one tree walk.
+
+    Element entries keep only their attribute dicts, so checks never go back
+    to the parse tree and every parser backend produces the same shape. Build
+    one per page and hand it to both SeoVerifier and AeoVerifier.
+    Lookups mirror the BeautifulSoup queries they replace: first match wins
+    for title/meta, rel is matched per token.
+    """
+
+    def __init__(self, backend='html.parser'):
+        self.backend = backend
+        self.parse_ms = 0.0             # wall time of from_html (parse + index)
+        self.title = None               # text of the first <title>, None when absent
+        self.meta_by_name = {}          # name -> attrs of the first <meta name=...>
+        self.meta_by_property = {}      # property -> attrs of the first <meta property=...>
+        self.links_by_rel = {}          # rel token -> [attrs of each <link>]
+        self.json_ld = []               # raw text (or None) of each ld+json <script>
+        self.headings = []              # (level, text) in document order
+        self.heading_offsets = []       # text_strings position where each heading starts
+        self.images = []                # attrs of each <img>
+        self.anchors = []               # attrs of each <a>
+        self.first_paragraph = None     # text of the first <p>, None when absent
+        self.tag_counts = {}            # tag name -> number of elements
+        self.text_strings = []          # visible strings, as get_text() would see them
+        self.truncated = False          # True when the input was cut at the size limit
+        self._text_cache = {}
+        self._structured_data = None
+
+    @classmethod
+    def from_html(cls, html_content, backend=None):
+        started = time.perf_counter()
+        if HTML_STREAM_MIN_CHARS and len(html_content) > HTML_STREAM_MIN_CHARS:
+            # No parse tree for very large pages; the cap is applied per chunk
+            index = cls._stream(iter_chunks(html_content), HTML_MAX_BYTES, backend)
+        else:
+            html_content, truncated = truncate_html(html_content)
+            index = cls._parse(html_content, resolve_backend(backend))
+            index.truncated = truncated
+        index.parse_ms = round((time.perf_counter() - started) * 1000, 2)
+        return index
+
+    @classmethod
+    def from_stream(cls, chunks, max_bytes=None, backend=None):
+        """Index str or bytes (UTF-8) chunks in one pass, without building a tree.
+
+        Memory stays bounded by the collected signals rather than the document:
+        chunks are parsed as they arrive and input past max_bytes (default
+        HTML_MAX_BYTES) is dropped at a tag boundary. The events come from
+        html.parser unless backend resolves to selectolax or lxml.
+        """
+        started = time.perf_counter()
+        index = cls._stream(chunks, HTML_MAX_BYTES if max_bytes is None else max_bytes, backend)
+        index.parse_ms = round((time.perf_counter() - started) * 1000, 2)
+        return index
+
+    @classmethod
+    def _stream(cls, chunks, max_bytes, backend=None):
+        # lxml's target parser applies the same implied end tags as its tree
+        use_lxml = resolve_backend(backend) != 'html.parser' and _module_available('lxml.etree')
+        index = cls(backend='lxml-stream' if use_lxml else 'html.parser-stream')
+        builder = _StreamBuilder(index)
+        if use_lxml:
+            parser = import_module('lxml.etree').HTMLParser(target=builder, encoding='utf-8')
+            feed = lambda text: parser.feed(text.encode('utf-8'))
+        else:
+            parser = _StdlibStreamParser(builder)
+            feed = parser.feed
+
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        remaining = max_bytes or None
+        fed = False
+        for chunk in chunks:
+            if remaining is not None and remaining <= 0:
+                index.truncated = bool(chunk)
+                if index.truncated:
+                    break
+                continue
+            text = decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+            if remaining is not None:
+                text, cut = truncate_html(text, remaining)
+                remaining -= len(text.encode('utf-8', errors='replace'))
+                index.truncated = cut
+            if text:
+                feed(text)
+                fed = True
+            if index.truncated:
+                break
+        if not index.truncated:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                feed(tail)
+                fed = True
+        if fed:
+            try:
+                parser.close()
+            except Exception as e:  # lxml raises on input it could not recover
+                logger.debug(f"Streaming parse ended with: {e}")
+        builder.close()
+        return index
+
+    @classmethod
+    def _parse(cls, html_content, backend):
+        try:
+            if backend == 'selectolax':
+                return cls.from_lexbor(html_content)
+            if backend == 'lxml':
+                return cls.from_lxml(html_content)
+        except Exception as e:
+            logger.warning(f"{backend} parse failed, retrying with html.parser: {e}")
+        return cls.from_soup(BeautifulSoup(html_content, 'html.parser'))
+
+    @classmethod
+    def from_soup(cls, soup):
+        index = cls(backend=soup.builder.NAME if soup.builder else 'html.parser')
+        string_types = soup.interesting_string_types or Tag.MAIN_CONTENT_STRING_TYPES
+        strings = index.text_strings
+
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                if type(node) in string_types:
+                    strings.append(str(node))
+                continue
+
+            name = node.name
+            index.tag_counts[name] = index.tag_counts.get(name, 0) + 1
+            if name == 'script':
+                if node.get('type') == JSON_LD_TYPE:
+                    index.json_ld.append(str(node.string) if node.string is not None else None)
+            elif index._wants_text(name):
+                index._add_text_element(name, node.get_text(strip=True), node.get_text(' ', strip=True))
+            else:
+                index._add_element(name, node.attrs)
+
+        return index
+
+    @classmethod
+    def from_lxml(cls, html_content):
+        lxml_html = import_module('lxml.html')
+        index = cls(backend='lxml')
+        if not html_content.strip():
+            return index
+
+        parser = lxml_html.HTMLParser(encoding='utf-8')
+        root = lxml_html.document_fromstring(html_content.encode('utf-8'), parser=parser)
+        strings = index.text_strings
+        skipped_depth = 0
+
+        for event, element in import_module('lxml.etree').iterwalk(root, events=LXML_WALK_EVENTS):
+            name = element.tag if isinstance(element.tag, str) else None
+            if event in ('comment', 'pi'):
+                # Not elements, but the text after them is their tail
+                if element.tail and not skipped_depth:
+                    strings.append(element.tail)
+            elif event == 'start':
+                if name is None:
+                    continue
+                if name in NON_TEXT_CONTAINERS:
+                    skipped_depth += 1
+                index.tag_counts[name] = index.tag_counts.get(name, 0) + 1
+                if name == 'script':
+                    if element.get('type') == JSON_LD_TYPE:
+                        index.json_ld.append(element.text)
+                elif index._wants_text(name):
+                    # Inside a template the whole subtree is non-text
+                    parts = [] if skipped_depth else cls._lxml_text_parts(element)
+                    index._add_text_element(name, ''.join(parts), ' '.join(parts))
+                else:
+                    index._add_element(name, _normalize_attrs(dict(element.attrib)))
+                if element.text and not skipped_depth:
+                    strings.append(element.text)
+            else:
+                if name in NON_TEXT_CONTAINERS:
+                    skipped_depth -= 1
+                if element.tail and not skipped_depth and element is not root:
+                    strings.append(element.tail)
+
+        return index
+
+    @staticmethod
+    def _lxml_text_parts(element):
+        parts = []
+        skipped_depth = 0
+        for event, node in import_module('lxml.etree').iterwalk(element, events=LXML_WALK_EVENTS):
+            name = node.tag if isinstance(node.tag, str) else None
+            if event in ('comment', 'pi'):
+                text = node.tail
+            elif event == 'start':
+                if name in NON_TEXT_CONTAINERS:
+                    skipped_depth += 1
+                text = node.text if name is not None else None
+            else:
+                if name in NON_TEXT_CONTAINERS:
+                    skipped_depth -= 1
+                text = node.tail if node is not element else None
+            if text and not skipped_depth and text.strip():
+                parts.append(text.strip())
+        return parts
+
+    @classmethod
+    def from_lexbor(cls, html_content):
+        lexbor = import_module('selectolax.lexbor')
+        index = cls(backend='selectolax')
+        tree = lexbor.LexborHTMLParser(html_content)
+        if tree.root is None:
+            return index
+        strings = index.text_strings
+
+        for node in tree.root.traverse(include_text=True):
+            name = node.tag
+            if name == '-text':
+                parent = node.parent
+                if parent is None or parent.tag not in NON_TEXT_CONTAINERS:
+                    strings.append(node.text_content)
+                continue
+            # Comments and PIs come as '-comment'/'_...' or, for PIs, no tag at all
+            if not name or name.startswith('-') or name.startswith('_'):
+                continue
+            index.tag_counts[name] = index.tag_counts.get(name, 0) + 1
+
+            if name == 'script':
+                if node.attributes.get('type') == JSON_LD_TYPE:
+                    raw = node.text(deep=True)
+                    index.json_ld.append(raw if raw else None)
+            elif index._wants_text(name):
+                parts = cls._lexbor_text_parts(node)
+                index._add_text_element(name, ''.join(parts), ' '.join(parts))
+            else:
+                index._add_element(name, _normalize_attrs(node.attributes))
+
+        return index
+
+    @staticmethod
+    def _lexbor_text_parts(element):
+        parts = []
+        for node in element.traverse(include_text=True):
+            if node.tag != '-text':
+                continue
+            parent = node.parent
+            if parent is not None and parent.tag in NON_TEXT_CONTAINERS:
+                continue
+            stripped = node.text_content.strip()
+            if stripped:
+                parts.append(stripped)
+        return parts
+
+    def _add_element(self, name, attrs):
+        if name == 'meta':
+            meta_name = attrs.get('name')
+            if meta_name is not None and meta_name not in self.meta_by_name:
+                self.meta_by_name[meta_name] = attrs
+            meta_property = attrs.get('property')
+            if meta_property is not None and meta_property not in self.meta_by_property:
+                self.meta_by_property[meta_property] = attrs
+        elif name == 'link':
+            rel = attrs.get('rel')
+            tokens = rel if isinstance(rel, list) else [rel] if rel else []
+            for token in dict.fromkeys(tokens):
+                self.links_by_rel.setdefault(token, []).append(attrs)
+        elif name == 'img':
+            self.images.append(attrs)
+        elif name == 'a':
+            self.anchors.append(attrs)
+
+    def _wants_text(self, name):
+        if name == 'title':
+            return self.title is None
+        if name == 'p':
+            return self.first_paragraph is None
+        return name in HEADING_TAGS
+
+    def _add_text_element(self, name, joined_text, spaced_text):
+        if name == 'title':
+            self.title = joined_text
+        elif name == 'p':
+            self.first_paragraph = joined_text
+        else:
+            self.headings.append((HEADING_TAGS[name], spaced_text))
+            self.heading_offsets.append(len(self.text_strings))
+
+    def text(self, separator='', strip=False):
+        """Equivalent of soup.get_text(separator, strip), computed once per variant."""
+        key = (separator, strip)
+        cached = self._text_cache.get(key)
+        if cached is None:
+            if strip:
+                parts = [s.strip() for s in self.text_strings]
+                cached = separator.join([s for s in parts if s])
+            else:
+                cached = separator.join(self.text_strings)
+            self._text_cache[key] = cached
+        return cached
+
+    @property
+    def structured_data(self):
+        """json_ld decoded and indexed once, shared by the SEO and AEO checks."""
+        if self._structured_data is None:
+            self._structured_data = StructuredData.from_scripts(self.json_ld)
+        return self._structured_data
+
+    def sections(self):
+        """(level, heading, strings) for each heading and the text_strings after it.
+
+        Text before the first heading comes first, with level 0 and heading None.
+        The heading's own strings are left out of its body.
+        """
+        bounds = [0] + self.heading_offsets + [len(self.text_strings)]
+        headings = [(0, None)] + self.headings
+        for (level, heading), start, end in zip(headings, bounds, bounds[1:]):
+            if heading:
+                # heading is ' '.join of its stripped non-empty strings
+                consumed = 0
+                while start < end and consumed < len(heading):
+                    stripped = self.text_strings[start].strip()
+                    if stripped:
+                        consumed += len(stripped) + 1
+                    start += 1
+            yield level, heading, self.text_strings[start:end]
+
+    def count(self, *names):
+        return sum(self.tag_counts.get(name, 0) for name in names)
+
+    def links(self, rel):
+        return self.links_by_rel.get(rel, [])
+
+    def count_headings(self, level):
+        return sum(1 for heading_level, _ in self.headings if heading_level == level)
+
+
+class _StreamBuilder:
+    """Parser target filling a DocumentIndex from start/end/data events.
+
+    Speaks lxml's target protocol; _StdlibStreamParser adapts html.parser to
+    it. Only the open-element stack and the pending text node are held, so
+    entries match what the tree walks collect without keeping the tree.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.stack = []             # open element names
+        self.skipped_depth = 0      # open NON_TEXT_CONTAINERS
+        self.captures = []          # [depth, stripped text parts, heading slot] of open title/p/h*
+        self.json_ld = None         # raw text parts of the open ld+json <script>
+        self.pending = []           # pieces of the current text node
+
+    def start(self, tag, attrib):
+        self._flush()
+        name = tag.lower()
+        index = self.index
+        index.tag_counts[name] = index.tag_counts.get(name, 0) + 1
+        if name == 'script':
+            if attrib.get('type') == JSON_LD_TYPE:
+                self.json_ld = []
+        elif index._wants_text(name):
+            slot = None
+            if name in HEADING_TAGS:
+                slot = len(index.headings)
+            index._add_text_element(name, '', '')   # reserve the entry in document order
+            # Keyed by stack depth: a nested <p> must not close the outer capture
+            self.captures.append([len(self.stack), [], slot])
+        else:
+            index._add_element(name, _normalize_attrs(attrib))
+
+        if name in VOID_ELEMENTS:
+            return
+        if name in NON_TEXT_CONTAINERS:
+            self.skipped_depth += 1
+        self.stack.append(name)
+
+    def end(self, tag):
+        name = tag.lower()
+        # Even a stray end tag ends the current text node, as in BeautifulSoup
+        self._flush()
+        if name not in self.stack:
+            return
+        while self.stack:
+            closed = self.stack.pop()
+            self._close(closed)
+            if closed == name:
+                break
+
+    def data(self, text):
+        if self.json_ld is not None:
+            self.json_ld.append(text)
+        if not self.skipped_depth:
+            self.pending.append(text)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        while self.stack:
+            self._close(self.stack.pop())
+        return self.index
+
+    def _close(self, name):
+        if name in NON_TEXT_CONTAINERS:
+            self.skipped_depth -= 1
+        if name == 'script' and self.json_ld is not None:
+            raw = ''.join(self.json_ld)
+            self.index.json_ld.append(raw if raw else None)
+            self.json_ld = None
+        if self.captures and self.captures[-1][0] == len(self.stack):
+            _, parts, slot = self.captures.pop()
+            if slot is None:
+                self.index._add_text_element(name, ''.join(parts), ' '.join(parts))
+            else:
+                self.index.headings[slot] = (HEADING_TAGS[name], ' '.join(parts))
+
+    def _flush(self):
+        if not self.pending:
+            return
+        text = ''.join(self.pending)
+        self.pending = []
+        self.index.text_strings.append(text)
+        stripped = text.strip()
+        if stripped:
+            for capture in self.captures:
+                capture[1].append(stripped)
+
+
+class _StdlibStreamParser(HTMLParser):
+    """html.parser front end for _StreamBuilder when lxml is not installed."""
+
+    def __init__(self, builder):
+        super().__init__(convert_charrefs=True)
+        self.builder = builder
+
+    def handle_starttag(self, tag, attrs):
+        self.builder.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.builder.start(tag, dict(attrs))
+        self.builder.end(tag)
+
+    def handle_endtag(self, tag):
+        self.builder.end(tag)
+
+    def handle_data(self, data):
+        self.builder.data(data)
+
+    def handle_comment(self, data):
+        self.builder.comment(data)
+
+    # Like comments, these end the current text node in BeautifulSoup's tree
+    def handle_pi(self, data):
+        self.builder.comment(data)
+
+    def handle_decl(self, decl):
+        self.builder.comment(decl)
+
+    def unknown_decl(self, data):
+        self.builder.comment(data)
@@ -3,8 +3,11 @@ import asyncio
 from api_manager import ApiManager
 
 class PageSpeedChecker:
-    def __init__(self, api_manager: ApiManager):
+    def __init__(self, api_manager: ApiManager, session=None, timeout=None):
         self.api_manager = api_manager
+        # Optional shared aiohttp session; a private one is opened when absent.
+        self.session = session
+        self.timeout = timeout or aiohttp.ClientTimeout(total=30)
         self.base_url = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
 
     async def analyze(self, target_url, strategy="mobile"):
@@ -20,25 +23,30 @@ class PageSpeedChecker:
             "category": ["performance", "seo"]
         }
 
+        if self.session is not None:
+            return await self._request(self.session, target_url, strategy, params)
         async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(self.base_url, params=params, timeout=30) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return self._parse_results(data)
-                    elif resp.status == 429: # Quota Exceeded
-                        print("🚫 Quota Exceeded. Rotating Key...")
-                        if self.api_manager.rotate_pagespeed_key():
-                            return await self.analyze(target_url, strategy) # Retry with new key
-                        else:
-                            return "❌ All PageSpeed Keys exhausted."
+            return await self._request(session, target_url, strategy, params)
+
+    async def _request(self, session, target_url, strategy, params):
+        try:
+            async with session.get(self.base_url, params=params, timeout=self.timeout) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    return self._parse_results(data)
+                elif resp.status == 429: # Quota Exceeded
+                    print("🚫 Quota Exceeded. Rotating Key...")
+                    if self.api_manager.rotate_pagespeed_key():
+                        return await self.analyze(target_url, strategy) # Retry with new key
                     else:
-                        error_text = await resp.text()
-                        return f"❌ PageSpeed API Error: {resp.status} - {error_text[:100]}"
-            except asyncio.TimeoutError:
-                return "❌ PageSpeed API Analysis Timed Out."
-            except Exception as e:
-                return f"❌ Error during PageSpeed Analysis: {e}"
+                        return "❌ All PageSpeed Keys exhausted."
+                else:
+                    error_text = await resp.text()
+                    return f"❌ PageSpeed API Error: {resp.status} - {error_text[:100]}"
+        except asyncio.TimeoutError:
+            return "❌ PageSpeed API Analysis Timed Out."
+        except Exception as e:
+            return f"❌ Error during PageSpeed Analysis: {e}"
 
     def _parse_results(self, data):
         """Extract key metrics from the JSON response."""
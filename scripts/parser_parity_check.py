@@ -0,0 +1,170 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from aeo_verifier import AeoVerifier
+from html_document import DocumentIndex, available_backends, iter_chunks
+from seo_verifier import SeoVerifier
+
+
+TARGET_URL = "https://shop.example.com/products/1"
+
+SEO_CHECKS = [
+    "check_title",
+    "check_meta_description",
+    "check_canonical",
+    "check_robots",
+    "check_viewport",
+    "check_open_graph",
+    "check_structured_data",
+    "check_hreflang",
+    "check_headings",
+    "check_content_length",
+    "check_geo_signals",
+]
+
+SAMPLE_PAGES = {
+    "product": """<!DOCTYPE html>
+<html lang="ko"><head>
+<meta charset="utf-8"><title>Example Shop | 무선 이어폰 프로 - 노이즈 캔슬링 블루투스 5.3 이어폰</title>
+<meta name="description" content="노이즈 캔슬링과 30시간 재생을 지원하는 무선 이어폰. 오늘 주문하면 내일 도착, 무료 반품과 1년 보증까지 함께 제공되는 베스트셀러 제품을 만나보세요.">
+<meta name="robots" content="index, follow"><meta name="viewport" content="width=device-width, initial-scale=1">
+<meta property="og:title" content="무선 이어폰 프로"><meta property="og:image" content="/og.png">
+<link rel="canonical" href="https://shop.example.com/products/1">
+<link rel="alternate" hreflang="ko-KR" href="https://shop.example.com/products/1">
+<link rel="alternate" hreflang="en" href="https://shop.example.com/en/products/1">
+<link rel="alternate" hreflang="x-default" href="https://shop.example.com/en/products/1">
+<link rel="preload stylesheet" href="/app.css">
+<script type="application/ld+json">{"@context":"https://schema.org","@graph":[{"@type":"Organization","name":"Example"},{"@type":"Product","name":"Pro"}]}</script>
+<script type="application/ld+json">[{"@type":"BreadcrumbList"}]</script>
+<style>body{font-family:sans-serif}</style>
+<script>window.__STATE__ = {"price": "$129"};</script>
+</head><body>
+<header><a href="/about">About us</a> <a href="/privacy">Privacy</a></header>
+<h1>무선 이어폰 <span>프로</span></h1>
+<p>가격: ₩129,000 (USD $99). 고객센터 02-123-4567.</p>
+<h2>Features</h2><ul><li>Noise cancelling</li><li>30h battery</li></ul>
+<table><tr><td>Weight</td><td>5g</td></tr></table>
+<img src="/img/a.webp" alt="front"><img src="https://cdn.example.com/b.jpg" alt=""><img alt="no src">
+<ruby>漢<rt>kan</rt></ruby>
+<!-- tracking: author=bot -->
+<template><p>template text</p></template>
+<footer>Written by the Example author team.</footer>
+</body></html>""",
+    "article": """<html><head><title>How to brew coffee</title>
+<meta name="description" content="Short.">
+<script type="application/ld+json">{"@type": "HowTo", "name": "Brew"}</script>
+<script type="application/ld+json">   </script>
+<script type="application/ld+json">{broken</script>
+</head><body><article><h1>Brew</h1><h1>Twice</h1>
+<p>Grind the beans. Heat water to 93C! Pour slowly? Wait four minutes.</p>
+<p>Serve.</p><ol><li>One</li></ol><a href="/authors/kim">Kim</a></article></body></html>""",
+    "empty": "",
+    "fragment": "<p>plain text only</p>",
+    "comments": """<html><head><title>Best Earbuds</title></head><body>
+<h1>Best <!--x-->Earbuds</h1><p>a<!--c-->b<!-- d -->c</p>
+<h2><!--lead-->Price<!--trail--></h2><p>Only <!--price-->$129 today.</p>
+<template><p>hidden<!--x-->text</p></template><script>/* <!-- --> */</script>
+<?php echo 1; ?>after pi<!--[if IE]><p>ie only</p><![endif]-->tail
+</body></html>""",
+    "cms_blocks": """<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">
+<title>무선 이어폰 | Shop</title></head><body>
+<!-- wp:heading --><h1 class="wp-block-heading">Shop <!-- wp:inline -->Best Earbuds</h1><!-- /wp:heading -->
+<!-- wp:paragraph --><p>가격: ₩129,000 <!-- price -->(USD $99). 고객센터 <!-- phone -->02-123-4567.</p><!-- /wp:paragraph -->
+<!-- wp:list --><ul><li>Noise <!-- x -->cancelling</li><!-- wp:list-item --><li>30h battery</li></ul><!-- /wp:list -->
+<!-- wp:paragraph -->Seoul, Gangnam-gu.<!-- /wp:paragraph -->
+</body></html>""",
+    "implied_end_tags": """<html><head><title>FAQ</title></head><body>
+<p>unclosed <p>second one.</p>
+<h3>heading <p>para</p></h3><p>Text here. More text.</p>
+<ul><li>one<li>two</ul><p>x <div>y</div> z</p><table><tr><td>a<td>b</table>
+</body></html>""",
+}
+
+
+def compare(name: str, html: str, backends):
+    baseline = None
+    mismatches = []
+    timings = {}
+
+    for backend in backends:
+        started = time.perf_counter()
+        if backend == "stream":
+            document = DocumentIndex.from_stream(iter_chunks(html, 4096))
+        else:
+            document = DocumentIndex.from_html(html, backend=backend)
+        seo = SeoVerifier(html, TARGET_URL, document=document)
+        aeo = AeoVerifier(document=document)
+        results = {check: getattr(seo, check)() for check in SEO_CHECKS}
+        results.update(
+            {
+                f"aeo.{key}": value
+                for key, value in aeo.analyze().items()
+                if key != "check_meta"
+            }
+        )
+        timings[backend] = round((time.perf_counter() - started) * 1000, 1)
+
+        if baseline is None:
+            baseline = results
+            continue
+        for check, expected in baseline.items():
+            if results.get(check) != expected:
+                mismatches.append(
+                    {
+                        "page": name,
+                        "backend": backend,
+                        "check": check,
+                        "expected": expected,
+                        "actual": results.get(check),
+                    }
+                )
+
+    return mismatches, timings
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    all_backends = "--all-backends" in args
+    pages = dict(SAMPLE_PAGES)
+    for arg in args:
+        if arg == "--all-backends":
+            continue
+        path = Path(arg)
+        pages[path.name] = path.read_text(encoding="utf-8", errors="replace")
+
+    # html.parser is the reference the streaming (tree-less) index must match.
+    # The opt-in backends apply HTML5 implied end tags and are only compared
+    # with --all-backends; "implied_end_tags" is expected to differ there.
+    backends = ["html.parser"]
+    if all_backends:
+        backends += [
+            backend for backend in available_backends() if backend != "html.parser"
+        ]
+    backends.append("stream")
+
+    mismatches = []
+    timings = {}
+    for name, html in pages.items():
+        page_mismatches, page_timings = compare(name, html, backends)
+        mismatches.extend(page_mismatches)
+        timings[name] = page_timings
+
+    report = {
+        "backends": backends,
+        "pages": len(pages),
+        "timings_ms": timings,
+        "mismatches": mismatches,
+    }
+    print("[OK] parser parity" if not mismatches else "[FAIL] parser parity")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
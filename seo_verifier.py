@@ -1,60 +1,72 @@
 import re
-import json
 import asyncio
 import aiohttp
+from contextlib import nullcontext
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from check_registry import CheckRegistry
+from html_document import DocumentIndex
+from signal_matcher import SignalPatterns
+
+# Every check, in report order, with what it reads, what it costs and its score weight
+SEO_CHECKS = CheckRegistry()
+
+# Localization tokens for check_geo_signals; add a locale's currencies and
+# phone formats here and they are found in the same single scan.
+GEO_PATTERNS = (
+    SignalPatterns()
+    .add('currency', 'KRW (₩)', literals=('₩', 'KRW'), locale='ko-KR')
+    .add('currency', 'USD ($)', literals=('$', 'USD'), locale='en-US')
+    .add('currency', 'EUR (€)', literals=('€', 'EUR'), locale='eu')
+    .add('currency', 'JPY (¥)', literals=('¥', 'JPY'), locale='ja-JP')
+    # Korea: 02-xxx-xxxx, 010-xxxx-xxxx
+    .add('phone', 'KR Phone Format', regex=r'0\d{1,2}-\d{3,4}-\d{4}', locale='ko-KR')
+    # US: (xxx) xxx-xxxx
+    .add('phone', 'US Phone Format', regex=r'\(\d{3}\) \d{3}-\d{4}', locale='en-US')
+)
 
 class SeoVerifier:
-    def __init__(self, html_content, target_url):
-        self.soup = BeautifulSoup(html_content, 'html.parser')
+    def __init__(self, html_content, target_url, asset_inventory=None, host_scheduler=None,
+                 http_session=None, parser_backend=None, document=None, image_probe=None):
+        # Single-pass index of everything the checks read (meta, links, text, ...)
+        self.document = document if document is not None else DocumentIndex.from_html(
+            html_content, backend=parser_backend)
         self.target_url = target_url
+        # Network waterfall captured while rendering (list of dicts with url,
+        # content_type, size_bytes, ...). Images found here need no HEAD check.
+        self.asset_inventory = {}
+        for asset in asset_inventory or []:
+            if asset.get('url') and not asset.get('blocked') and not asset.get('failed'):
+                self.asset_inventory[asset['url']] = asset
+        # Optional per-host politeness gate (slot(url) / record_response(...)).
+        self.host_scheduler = host_scheduler
+        # Optional shared aiohttp session; a private one is opened when absent.
+        self.http_session = http_session
+        # Optional cached image prober (probe_many(urls, session) -> {url: info});
+        # without one only the first few images get an inline HEAD check.
+        self.image_probe = image_probe
         self.results = {}
 
-    async def analyze(self):
-        """Run all analysis methods and return the results."""
-        self.results['meta_title'] = self.check_title()
-        self.results['meta_description'] = self.check_meta_description()
-        self.results['canonical'] = self.check_canonical()
-        self.results['robots'] = self.check_robots()
-        self.results['viewport'] = self.check_viewport()
-        self.results['open_graph'] = self.check_open_graph()
-        self.results['structured_data'] = self.check_structured_data()
-        self.results['hreflang'] = self.check_hreflang()
-        self.results['heading_structure'] = self.check_headings()
-        # Async check for images
-        self.results['images'] = await self.check_images()
-        self.results['content_length'] = self.check_content_length()
-        self.results['geo_signals'] = self.check_geo_signals()
-        
-        # Calculate Score
+    async def analyze(self, checks=None, skip=None):
+        """Run the registered checks (all, or a subset by name/cost) and return the results."""
+        results, check_meta = await SEO_CHECKS.run(self, only=checks, skip=skip)
+        self.results = results
+        # Checks that were not run deduct nothing
         self.results['score'] = self.calculate_score()
+        check_meta['parse_ms'] = self.document.parse_ms
+        check_meta['truncated'] = self.document.truncated
+        self.results['check_meta'] = check_meta
         
         return self.results
 
     def calculate_score(self):
-        score = 100
-        # Basic deductions
-        if self.results['meta_title']['status'] != '✅ Pass': score -= 10
-        if self.results['meta_description']['status'] != '✅ Pass': score -= 10
-        if self.results['canonical']['status'] != '✅ Pass': score -= 10
-        if self.results['robots']['status'] != '✅ Pass': score -= 10
-        if self.results['viewport']['status'] != '✅ Pass': score -= 10
-        if self.results['open_graph']['status'] != '✅ Pass': score -= 5
-        if self.results['structured_data']['status'] != '✅ Pass': score -= 5
-        if self.results['hreflang']['status'] == '❌ Fail': score -= 5
-        if self.results['heading_structure']['status'] != '✅ Pass': score -= 5
-        if self.results['images']['status'] != '✅ Pass': score -= 5
-        if self.results['content_length']['status'] != '✅ Pass': score -= 5
-        
-        return max(0, score)
+        return SEO_CHECKS.score(self.results)
 
+    @SEO_CHECKS.register('meta_title', inputs=('title',), weight=10)
     def check_title(self):
-        title_tag = self.soup.find('title')
-        if not title_tag:
+        title_text = self.document.title
+        if title_text is None:
             return {"status": "❌ Fail", "value": "Missing", "details": "Title tag is missing."}
         
-        title_text = title_tag.get_text(strip=True)
         length = len(title_text)
         status = "✅ Pass" if 50 <= length <= 60 else "⚠️ Warning"
         return {
@@ -64,9 +76,10 @@ class SeoVerifier:
             "details": f"Length: {length} chars (Recommended: 50-60)"
         }
 
+    @SEO_CHECKS.register('meta_description', inputs=('meta_by_name',), weight=10)
     def check_meta_description(self):
-        meta_desc = self.soup.find('meta', attrs={'name': 'description'})
-        if not meta_desc:
+        meta_desc = self.document.meta_by_name.get('description')
+        if meta_desc is None:
             return {"status": "❌ Fail", "value": "Missing", "details": "Meta description is missing."}
         
         content = meta_desc.get('content', '').strip()
@@ -79,9 +92,11 @@ class SeoVerifier:
             "details": f"Length: {length} chars (Recommended: 150-160)"
         }
 
+    @SEO_CHECKS.register('canonical', inputs=('links_by_rel',), weight=10)
     def check_canonical(self):
-        canonical = self.soup.find('link', rel='canonical')
-        if not canonical:
+        canonicals = self.document.links('canonical')
+        canonical = canonicals[0] if canonicals else None
+        if canonical is None:
             return {"status": "❌ Fail", "value": "Missing", "details": "Canonical tag is missing."}
         
         href = canonical.get('href', '').strip()
@@ -93,9 +108,10 @@ class SeoVerifier:
             "details": "Points to current URL (Self-referencing)" if is_match else f"Points to other URL: {href}"
         }
 
+    @SEO_CHECKS.register('robots', inputs=('meta_by_name',), weight=10)
     def check_robots(self):
-        robots = self.soup.find('meta', attrs={'name': 'robots'})
-        if not robots:
+        robots = self.document.meta_by_name.get('robots')
+        if robots is None:
             return {"status": "⚠️ Warning", "value": "Missing", "details": "Robots meta tag is missing."}
         
         content = robots.get('content', '').lower()
@@ -103,18 +119,20 @@ class SeoVerifier:
              return {"status": "✅ Pass", "value": content, "details": "Allowed to Index & Follow"}
         return {"status": "⚠️ Warning", "value": content, "details": "Does not explicitly allow index, follow"}
 
+    @SEO_CHECKS.register('viewport', inputs=('meta_by_name',), weight=10)
     def check_viewport(self):
-        viewport = self.soup.find('meta', attrs={'name': 'viewport'})
-        if viewport:
+        viewport = self.document.meta_by_name.get('viewport')
+        if viewport is not None:
             return {"status": "✅ Pass", "value": viewport.get('content', ''), "details": "Viewport tag present"}
         return {"status": "❌ Fail", "value": "Missing", "details": "Viewport tag missing (Mobile friendliness issue)"}
 
+    @SEO_CHECKS.register('open_graph', inputs=('meta_by_property',), weight=5)
     def check_open_graph(self):
         og_tags = ['og:title', 'og:description', 'og:image']
         found = []
         missing = []
         for tag in og_tags:
-            if self.soup.find('meta', property=tag):
+            if tag in self.document.meta_by_property:
                 found.append(tag)
             else:
                 missing.append(tag)
@@ -127,30 +145,15 @@ class SeoVerifier:
             "details": f"Found: {', '.join(found)}. Missing: {', '.join(missing)}"
         }
 
+    @SEO_CHECKS.register('structured_data', inputs=('json_ld',), weight=5)
     def check_structured_data(self):
-        scripts = self.soup.find_all('script', type='application/ld+json')
-        if not scripts:
+        if not self.document.json_ld:
              return {"status": "⚠️ Warning", "details": "No JSON-LD Structured Data found"}
-        
-        found_types = []
-        errors = []
-        
-        for script in scripts:
-            try:
-                data = json.loads(script.string if script.string else '{}')
-                if isinstance(data, dict):
-                    if '@type' in data:
-                        found_types.append(data['@type'])
-                    elif '@graph' in data:
-                        for item in data['@graph']:
-                            if '@type' in item:
-                                found_types.append(item['@type'])
-                elif isinstance(data, list):
-                    for item in data:
-                        if '@type' in item:
-                            found_types.append(item['@type'])
-            except json.JSONDecodeError:
-                errors.append("JSON-LD Syntax Error")
+
+        # Decoded once per page and shared with the AEO schema check
+        structured_data = self.document.structured_data
+        found_types = structured_data.top_level_types
+        errors = ["JSON-LD Syntax Error" for _ in structured_data.errors]
 
         required_types = ['Organization', 'WebSite', 'BreadcrumbList']
         present_required = [t for t in found_types if t in required_types]
@@ -159,13 +162,14 @@ class SeoVerifier:
         
         return {
             "status": status,
-            "found_types": found_types,
+            "found_types": list(found_types),
             "errors": errors,
             "details": f"Types Found: {', '.join(found_types)}" if found_types else "Key Schemas missing"
         }
 
+    @SEO_CHECKS.register('hreflang', inputs=('links_by_rel',), weight=5, penalize='fail')
     def check_hreflang(self):
-        hreflangs = self.soup.find_all('link', rel='alternate', hreflang=True)
+        hreflangs = [link for link in self.document.links('alternate') if link.get('hreflang') is not None]
         if not hreflangs:
              return {"status": "⚠️ Warning", "details": "No hreflang tags found"}
 
@@ -207,9 +211,9 @@ class SeoVerifier:
             "details": "; ".join(details)
         }
 
+    @SEO_CHECKS.register('heading_structure', inputs=('headings',), weight=5)
     def check_headings(self):
-        h1_tags = self.soup.find_all('h1')
-        h1_count = len(h1_tags)
+        h1_count = self.document.count_headings(1)
         
         status = "✅ Pass" if h1_count == 1 else "❌ Fail"
         return {
@@ -218,9 +222,10 @@ class SeoVerifier:
             "details": f"H1 Count: {h1_count} (Recommended: 1)"
         }
 
+    @SEO_CHECKS.register('images', inputs=('images', 'asset_inventory'), cost='network', weight=5)
     async def check_images(self):
-        """Check images via HEAD checks logic."""
-        images = self.soup.find_all('img')
+        """Check images from the render network log, falling back to HEAD checks."""
+        images = self.document.images
         total = len(images)
         missing_alt = 0
         img_urls = []
@@ -235,30 +240,57 @@ class SeoVerifier:
                 if full_url.startswith('http'):
                     img_urls.append(full_url)
 
-        # Optimization: Check first 5 images via HEAD request to save costs/time
         images_stats = {"total_size_mb": 0.0, "webp_count": 0, "checked_count": 0}
-        
+
+        def add_stat(length, c_type):
+            images_stats['checked_count'] += 1
+            images_stats['total_size_mb'] += length / (1024 * 1024)
+            if 'webp' in c_type or 'avif' in c_type:
+                images_stats['webp_count'] += 1
+
+        # Images the browser already downloaded are read from the network log
+        unlogged_urls = []
+        for url in dict.fromkeys(img_urls):
+            asset = self.asset_inventory.get(url)
+            if asset and asset.get('size_bytes') is not None:
+                add_stat(asset['size_bytes'], (asset.get('content_type') or '').lower())
+            else:
+                unlogged_urls.append(url)
+        from_network_log = images_stats['checked_count']
+
+        # Optimization: Check first 5 remaining images via HEAD request to save costs/time
         async def check_head(session, url):
+            gate = self.host_scheduler.slot(url) if self.host_scheduler else nullcontext()
             try:
                 # Timeout set low to avoid hanging
-                async with session.head(url, timeout=3) as resp:
+                async with gate, session.head(url, timeout=3) as resp:
+                    if self.host_scheduler:
+                        self.host_scheduler.record_response(
+                            url, resp.status, resp.headers.get('Retry-After'))
                     length = int(resp.headers.get('Content-Length', 0))
                     c_type = resp.headers.get('Content-Type', '').lower()
                     return length, c_type
             except:
                 return 0, ''
 
-        # Limit concurrency
-        connector = aiohttp.TCPConnector(limit=5)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            tasks = [check_head(session, url) for url in img_urls[:5]] # Check only first 5 for speed
-            results = await asyncio.gather(*tasks)
-            
+        if unlogged_urls and self.image_probe is not None:
+            probed = await self.image_probe.probe_many(unlogged_urls, session=self.http_session)
+            for info in probed.values():
+                if info.get('size_bytes') is not None:
+                    add_stat(info['size_bytes'], info.get('content_type') or info.get('format') or '')
+        elif unlogged_urls:
+            if self.http_session is not None:
+                tasks = [check_head(self.http_session, url) for url in unlogged_urls[:5]]
+                results = await asyncio.gather(*tasks)
+            else:
+                # Limit concurrency
+                connector = aiohttp.TCPConnector(limit=5)
+                async with aiohttp.ClientSession(connector=connector) as session:
+                    tasks = [check_head(session, url) for url in unlogged_urls[:5]] # Check only first 5 for speed
+                    results = await asyncio.gather(*tasks)
+
             for length, c_type in results:
-                images_stats['checked_count'] += 1
-                images_stats['total_size_mb'] += length / (1024 * 1024)
-                if 'webp' in c_type or 'avif' in c_type:
-                    images_stats['webp_count'] += 1
+                add_stat(length, c_type)
 
         status = "✅ Pass"
         details_list = []
@@ -284,11 +316,15 @@ class SeoVerifier:
             "status": status,
             "total": total,
             "missing_alt": missing_alt,
+            "checked_count": images_stats['checked_count'],
+            "unchecked_count": len(set(img_urls)) - images_stats['checked_count'],
+            "from_network_log": from_network_log,
             "details": ", ".join(details_list)
         }
 
+    @SEO_CHECKS.register('content_length', inputs=('text',), weight=5)
     def check_content_length(self):
-        text = self.soup.get_text(separator=' ', strip=True)
+        text = self.document.text(separator=' ', strip=True)
         word_count = len(text.split())
         
         status = "✅ Pass" if word_count >= 300 else "⚠️ Warning"
@@ -298,27 +334,14 @@ class SeoVerifier:
             "details": f"Word count: {word_count}"
         }
 
+    @SEO_CHECKS.register('geo_signals', inputs=('text',))
     def check_geo_signals(self):
         """Check for GEO-specific signals like currency and address formats."""
-        text = self.soup.get_text()
-        
-        # Currency Symbols
-        currencies = []
-        if '₩' in text or 'KRW' in text: currencies.append("KRW (₩)")
-        if '$' in text or 'USD' in text: currencies.append("USD ($)")
-        if '€' in text or 'EUR' in text: currencies.append("EUR (€)")
-        if '¥' in text or 'JPY' in text: currencies.append("JPY (¥)")
-        
-        # Phone Numbers (Simple Regex for now)
-        # Korea: 02-xxx-xxxx, 010-xxxx-xxxx
-        korea_phone = re.search(r'0\d{1,2}-\d{3,4}-\d{4}', text)
-        # US/Intl: +1, (xxx) xxx-xxxx
-        us_phone = re.search(r'\(\d{3}\) \d{3}-\d{4}', text)
-        
-        phones = []
-        if korea_phone: phones.append("KR Phone Format")
-        if us_phone: phones.append("US Phone Format")
-        
+        # Currency symbols and phone formats in one pass over the text
+        found = GEO_PATTERNS.match(self.document.text())
+        currencies = found['currency']
+        phones = found['phone']
+
         status = "ℹ️ Info"
         return {
             "status": status,
@@ -348,6 +371,8 @@ class SeoVerifier:
         }
 
         for key, result in self.results.items():
+            if not isinstance(result, dict) or key == 'check_meta':
+                continue
             name = display_names.get(key, key.replace('_', ' ').title())
             status = result.get('status', '❓')
             details = result.get('details', '')
@@ -0,0 +1,88 @@
+import re
+from dataclasses import dataclass
+
+
+@dataclass
+class SignalPattern:
+    group: str           # what the label reports as, e.g. 'currency', 'phone'
+    label: str           # value reported when any of the sources matches
+    sources: tuple       # regex alternatives (literals are escaped on add)
+    locale: str = ''     # '' for locale-neutral patterns
+
+
+class SignalPatterns:
+    """Labelled token and regex patterns scanned in a single pass over a text.
+
+    Every pattern is compiled into one alternation, so a page is read once
+    however many labels or locales are added. The alternation is kept flat,
+    without capturing groups (either disables the regex engine's first-character
+    prefilter), and each hit is mapped back to its pattern by the matched text.
+    Matches are leftmost and do not overlap; a label's patterns drop out of the
+    scan once it has been seen and the scan ends when every label has. Results
+    come back in registration order.
+    """
+
+    def __init__(self):
+        self._patterns = []
+
+    def add(self, group, label, literals=(), regex=None, ignore_case=False, locale=''):
+        sources = [re.escape(token) for token in sorted(literals, key=len, reverse=True)]
+        if regex:
+            sources.append(f'(?:{regex})' if '|' in regex else regex)
+        if not sources:
+            raise ValueError(f"Signal '{label}' needs literals or a regex")
+        if ignore_case:
+            sources = [f'(?i:{source})' for source in sources]
+        self._patterns.append(SignalPattern(group, label, tuple(sources), locale))
+        return self
+
+    @property
+    def locales(self):
+        return sorted({pattern.locale for pattern in self._patterns if pattern.locale})
+
+    def for_locales(self, locales):
+        """Copy limited to the given locales plus the locale-neutral patterns."""
+        wanted = set(locales)
+        subset = SignalPatterns()
+        subset._patterns = [p for p in self._patterns if not p.locale or p.locale in wanted]
+        return subset
+
+    def labels(self, group=None):
+        seen = dict.fromkeys(p.label for p in self._patterns if group is None or p.group == group)
+        return list(seen)
+
+    def match(self, *texts):
+        """{group: [labels found in any of texts]} with every group present."""
+        found = set()
+        for text in texts:
+            position = 0
+            while text:
+                remaining = [p for p in self._patterns if p.label not in found]
+                if not remaining:
+                    break
+                match = self._scanner(remaining).search(text, position)
+                if match is None:
+                    break
+                found.add(self._label_for(match.group(), remaining))
+                position = match.end()
+
+        result = {}
+        for pattern in self._patterns:
+            labels = result.setdefault(pattern.group, [])
+            if pattern.label in found and pattern.label not in labels:
+                labels.append(pattern.label)
+        return result
+
+    @staticmethod
+    def _scanner(patterns):
+        # re caches compiled patterns, so each label subset is compiled once
+        return re.compile('|'.join(source for p in patterns for source in p.sources))
+
+    @staticmethod
+    def _label_for(token, patterns):
+        # Earlier branches failed at the match position, so the first pattern
+        # that matches the whole token is the branch that produced it.
+        for pattern in patterns:
+            if re.fullmatch('|'.join(pattern.sources), token):
+                return pattern.label
+        return patterns[-1].label
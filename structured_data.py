@@ -0,0 +1,106 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional fast decoder; json gives the same result
+    orjson = None
+
+
+def _loads(raw):
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (NaN, >64-bit ints, lone surrogates); let
+            # json decide so both decoders accept exactly the same documents.
+            pass
+    return json.loads(raw)
+
+
+def _types(entity):
+    value = entity.get('@type')
+    values = value if isinstance(value, list) else [value]
+    return [item for item in values if isinstance(item, str)]
+
+
+def _entities(value):
+    """Every dict in a decoded JSON value, depth first in document order."""
+    entities = []
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        # Exact type checks: decoded JSON only holds plain dicts and lists
+        if type(node) is dict:
+            entities.append(node)
+            children = node.values()
+        elif type(node) is list:
+            children = node
+        else:
+            continue
+        for child in reversed(children):
+            if type(child) is dict or type(child) is list:
+                stack.append(child)
+    return entities
+
+
+class StructuredData:
+    """All JSON-LD blocks of a page, decoded once and indexed by type.
+
+    Top-level entities are the root object of a block, each item of a root
+    list, or each @graph member of a root object without its own @type;
+    `types` also covers entities nested anywhere below them (offers, authors,
+    FAQ answers, ...).
+    """
+
+    def __init__(self):
+        self.blocks = []             # decoded value of each block (None if empty or invalid)
+        self.errors = []             # (block position, decoder message)
+        self.top_level_types = []    # @type of each top-level entity, list values flattened
+        self.types = []              # every @type, nested ones included, in document order
+        self.entities_by_type = {}   # type -> [entity dicts], nested ones included
+
+    @classmethod
+    def from_scripts(cls, scripts):
+        data = cls()
+        for position, raw in enumerate(scripts):
+            try:
+                block = _loads(raw) if raw else None
+            except (ValueError, RecursionError) as e:
+                data.blocks.append(None)
+                data.errors.append((position, str(e)))
+                continue
+            data.blocks.append(block)
+            if block is not None:
+                data._index(block)
+        return data
+
+    def _index(self, block):
+        roots = block if isinstance(block, list) else [block]
+        for root in roots:
+            if not isinstance(root, dict):
+                continue
+            if '@type' in root:
+                self.top_level_types.extend(_types(root))
+            elif isinstance(root.get('@graph'), list):
+                for member in root['@graph']:
+                    if isinstance(member, dict):
+                        self.top_level_types.extend(_types(member))
+
+        types = self.types
+        entities_by_type = self.entities_by_type
+        for entity in _entities(block):
+            type_value = entity.get('@type')
+            if type_value is None:
+                continue
+            for type_name in (type_value,) if type(type_value) is str else _types(entity):
+                types.append(type_name)
+                bucket = entities_by_type.get(type_name)
+                if bucket is None:
+                    bucket = entities_by_type[type_name] = []
+                bucket.append(entity)
+
+    def has_type(self, *type_names):
+        return any(name in self.entities_by_type for name in type_names)
+
+    def entities(self, type_name):
+        return self.entities_by_type.get(type_name, [])